@@ -0,0 +1,57 @@
+# bench_batch_fit.py
+#
+# Benchmark sbnd_fit.fit_gauss_batch against a loop of scipy.optimize.curve_fit
+# calls (as in data_mc_example: unweighted, p0 = [max, 0, 1]) on many Gaussian
+# channel histograms sharing one binning, and report the largest parameter
+# difference between the two.
+#
+#     python benchmarks/bench_batch_fit.py [--hists 1000] [--bins 50] [--entries 10000]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sbnd_fit import fit_gauss_batch, gauss
+
+def make_hists(n_hists, n_bins, n_entries, rng):
+    """(n_hists, n_bins) Poisson-fluctuated Gaussians with random mean and width."""
+    edges = np.linspace(-5, 5, n_bins + 1)
+    centers = 0.5 * (edges[1:] + edges[:-1])
+    mu = rng.uniform(-1, 1, n_hists)
+    sigma = rng.uniform(0.5, 1.5, n_hists)
+    expected = gauss(centers[None, :], 1.0, mu[:, None], sigma[:, None])
+    expected *= n_entries / expected.sum(axis=1, keepdims=True)
+    return rng.poisson(expected).astype(float), edges
+
+def main():
+    parser = argparse.ArgumentParser(description='batched Gaussian fit vs curve_fit loop')
+    parser.add_argument('--hists', type=int, default=1000)
+    parser.add_argument('--bins', type=int, default=50)
+    parser.add_argument('--entries', type=int, default=10000)
+    args = parser.parse_args()
+
+    counts, edges = make_hists(args.hists, args.bins, args.entries, np.random.default_rng(0))
+    centers = 0.5 * (edges[1:] + edges[:-1])
+
+    t0 = time.perf_counter()
+    ref = np.array([curve_fit(gauss, centers, c, p0=[c.max(), 0, 1])[0] for c in counts])
+    loop_time = time.perf_counter() - t0
+    ref[:, 2] = np.abs(ref[:, 2])
+
+    print(f"{'method':<14} {'time [s]':>9} {'speedup':>8} {'converged':>10} {'max |dparam|':>13}")
+    print(f"{'curve_fit':<14} {loop_time:9.4f} {1:7.1f}x {len(ref):>10} {0:13.2e}")
+    for method in ('lm', 'log-parabola'):
+        t0 = time.perf_counter()
+        result = fit_gauss_batch(counts, edges, method=method)
+        batch_time = time.perf_counter() - t0
+        diff = np.abs(result.params - ref).max()
+        print(f"{method:<14} {batch_time:9.4f} {loop_time / batch_time:7.1f}x "
+              f"{result.converged.sum():>10} {diff:13.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# bench_export.py
+#
+# Write a batch of figures as PNG + PDF + SVG with one fig.savefig per format
+# (three renders per figure) and with sbnd_style.export (one Agg render, PNG
+# encoded from its buffer, PDF/SVG written concurrently from a snapshot in
+# worker threads or processes), and report the wall time per figure.
+#
+#     python benchmarks/bench_export.py [--figures 10] [--formats png pdf svg] [--workers 2]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sbnd_style
+from sbnd_hist import SBNDHist1D, SBNDHist2D
+
+def make_figure(rng):
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    x, y = rng.normal(0, 1.5, 100000), rng.normal(0, 2, 100000)
+    hist = SBNDHist2D((100, 120), range=((-5, 5), (-5, 7))).fill(x, y)
+    hist.plot(ax1)
+    hist.contour(ax1)
+    SBNDHist1D(50, range=(-5, 5)).fill(x).plot(ax2, histtype='errorbar')
+    sbnd_style.wip(ax1)
+    return fig
+
+def main():
+    parser = argparse.ArgumentParser(description='multi-format export vs repeated savefig')
+    parser.add_argument('--figures', type=int, default=10)
+    parser.add_argument('--formats', nargs='+', default=['png', 'pdf', 'svg'])
+    parser.add_argument('--workers', type=int, default=sbnd_style.VECTOR_WORKERS)
+    args = parser.parse_args()
+    sbnd_style.set_sbnd_style()
+    sbnd_style.VECTOR_WORKERS = args.workers
+
+    def savefig(fig, base):
+        for fmt in args.formats:
+            fig.savefig(f"{base}.{fmt}")
+
+    cases = {
+        'savefig per format': savefig,
+        'export (threads)': lambda fig, base: sbnd_style.export(
+            fig, base, args.formats, vector_workers='thread', wait=False),
+        'export (processes)': lambda fig, base: sbnd_style.export(
+            fig, base, args.formats, vector_workers='process', wait=False),
+    }
+    print(f"{args.figures} figures as {'/'.join(args.formats)}, {os.cpu_count()} CPUs, "
+          f"{args.workers} vector workers")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, write in cases.items():
+            rng = np.random.default_rng(0)
+            t0 = time.perf_counter()
+            for i in range(args.figures):
+                fig = make_figure(rng)
+                write(fig, os.path.join(tmp, f"fig{i}"))
+                plt.close(fig)
+            sbnd_style.wait_saves()
+            print(f"{name:<20} {1e3 * (time.perf_counter() - t0) / args.figures:8.1f} ms/figure")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bench_fill.py
+#
+# Benchmark sbnd_hist.histogram_fill (arithmetic bin indices + np.bincount)
+# against np.histogram2d, using the two_d_example binning (100 x 120 uniform bins
+# over [-5, 5] x [-5, 7]). Both weighted and unweighted fills are timed, on one
+# thread and with the threaded fill (--threads, default one per CPU).
+#
+# Before timing, the bin contents are checked against np.histogram2d for
+# continuous values and for values quantised to 0.01, which land exactly on
+# bin edges (as ADC counts or rounded energies do).
+#
+#     python benchmarks/bench_fill.py [--max-exp 8] [--repeat 3] [--threads N]
+#
+# 1e8 entries need about 5 GB of memory for the inputs and temporaries.
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sbnd_hist import histogram_fill
+
+XEDGES = np.linspace(-5, 5, 101)
+YEDGES = np.linspace(-5, 7, 121)
+
+def best_time(func, repeat):
+    """Best wall time of `repeat` calls."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return min(timings)
+
+def check_agreement(rng, n=200_000):
+    """Assert that histogram_fill matches np.histogram2d bin for bin."""
+    x = rng.normal(0, np.sqrt(2), n)
+    y = rng.normal(0, np.sqrt(3), n)
+    w = rng.random(n)
+    for name, (cx, cy) in (('continuous', (x, y)),
+                           ('quantised', (np.round(x, 2), np.round(y, 2)))):
+        for weights in (None, w):
+            ref = np.histogram2d(cx, cy, bins=(XEDGES, YEDGES), weights=weights)[0]
+            for n_threads in (1, 4):
+                sumw = histogram_fill([cx, cy], [XEDGES, YEDGES], weights, n_threads)[0]
+                np.testing.assert_allclose(sumw[1:-1, 1:-1], ref, rtol=1e-12, atol=0,
+                                           err_msg=f"{name} inputs, weights={weights is not None}")
+    print("histogram_fill agrees with np.histogram2d (continuous and quantised inputs)")
+
+def main():
+    parser = argparse.ArgumentParser(description='histogram_fill vs np.histogram2d benchmark')
+    parser.add_argument('--min-exp', type=int, default=5)
+    parser.add_argument('--max-exp', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    check_agreement(rng)
+    threads_col = f"{args.threads} threads [s]"
+    print(f"{'entries':>8} {'weights':>8} {'histogram2d [s]':>16} {'bincount [s]':>13} "
+          f"{threads_col:>15} {'speedup':>8}")
+    for exp in range(args.min_exp, args.max_exp + 1):
+        n = 10**exp
+        x = rng.normal(0, np.sqrt(2), n)
+        y = rng.normal(0, np.sqrt(3), n)
+        w = rng.random(n)
+        for weights in (None, w):
+            ref = best_time(lambda: np.histogram2d(x, y, bins=(XEDGES, YEDGES), weights=weights),
+                            args.repeat)
+            new = best_time(lambda: histogram_fill([x, y], [XEDGES, YEDGES], weights),
+                            args.repeat)
+            threaded = best_time(lambda: histogram_fill([x, y], [XEDGES, YEDGES], weights,
+                                                        n_threads=args.threads),
+                                 args.repeat)
+            print(f"{'1e%d' % exp:>8} {str(weights is not None):>8} {ref:16.4f} {new:13.4f} "
+                  f"{threaded:15.4f} {ref / min(new, threaded):7.1f}x")
+        del x, y, w
+
+if __name__ == "__main__":
+    main()
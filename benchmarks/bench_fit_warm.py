@@ -0,0 +1,89 @@
+# bench_fit_warm.py
+#
+# Simulate a monitoring loop refitting slowly drifting channel histograms and
+# compare curve_fit with a numerical Jacobian from a fixed p0 = [max, *nominal]
+# (as test.py used to), sbnd_fit.fit with the analytic Jacobian from the moment guess, and
+# sbnd_fit.fit warm-started from the previous result of each channel.
+#
+# Levenberg-Marquardt iterations are compared, not function evaluations: with
+# a numerical Jacobian curve_fit's nfev includes the n_params finite-difference
+# calls of every iteration, with an analytic one it does not (those are njev).
+# Numerical iterations are estimated as nfev / (n_params + 1).
+#
+#     python benchmarks/bench_fit_warm.py [--channels 200] [--updates 20] [--shape gauss]
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+from scipy.optimize import OptimizeWarning, curve_fit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sbnd_fit import SHAPES, clear_fit_cache, fit
+
+TRUE_PARAMS = {'gauss': [1, 0, 1], 'gauss_const': [1, 0, 1, 0.1],
+               'expo': [1, 1.5], 'moyal': [1, 0, 0.7]}
+
+def make_updates(shape, n_channels, n_updates, n_entries, rng):
+    """Per update, (n_channels, bins) histograms whose parameters drift slowly."""
+    x = np.linspace(-5, 5, 50) if shape != 'expo' else np.linspace(0, 10, 50)
+    base = np.array(TRUE_PARAMS[shape], dtype=float)
+    params = base * rng.uniform(0.8, 1.2, (n_channels, len(base)))
+    updates = []
+    for _ in range(n_updates):
+        params *= rng.uniform(0.99, 1.01, params.shape)
+        expected = np.array([SHAPES[shape].func(x, *p) for p in params])
+        expected *= n_entries / expected.sum(axis=1, keepdims=True)
+        updates.append(rng.poisson(expected).astype(float))
+    return x, updates
+
+def main():
+    parser = argparse.ArgumentParser(description='warm-started fits in a monitoring loop')
+    parser.add_argument('--channels', type=int, default=200)
+    parser.add_argument('--updates', type=int, default=20)
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--shape', default='gauss', choices=sorted(TRUE_PARAMS))
+    args = parser.parse_args()
+
+    x, updates = make_updates(args.shape, args.channels, args.updates, args.entries,
+                              np.random.default_rng(0))
+    func = SHAPES[args.shape].func
+    base_scale = 1 / func(x, *TRUE_PARAMS[args.shape]).max()
+    warnings.simplefilter('ignore', OptimizeWarning)
+
+    n_params = len(TRUE_PARAMS[args.shape])
+
+    def numeric():
+        nfev = 0
+        for counts in updates:
+            for y in counts:
+                p0 = [y.max() * base_scale] + TRUE_PARAMS[args.shape][1:]
+                nfev += curve_fit(func, x, y, p0=p0, full_output=True)[2]['nfev']
+        return nfev, nfev / (n_params + 1)
+
+    def analytic(warm):
+        clear_fit_cache()
+        nfev = njev = 0
+        for counts in updates:
+            for channel, y in enumerate(counts):
+                result = fit(x, y, shape=args.shape, key=channel if warm else None)
+                nfev += result.nfev
+                njev += result.njev
+        return nfev, njev
+
+    n_fits = args.channels * args.updates
+    print(f"{'method':<22} {'time/fit [us]':>14} {'iterations/fit':>15} {'nfev/fit':>9}")
+    for name, run in [('numerical jac, fixed', numeric),
+                      ('analytic jac, cold', lambda: analytic(False)),
+                      ('analytic jac, warm', lambda: analytic(True))]:
+        t0 = time.perf_counter()
+        nfev, iterations = run()
+        seconds = time.perf_counter() - t0
+        print(f"{name:<22} {1e6 * seconds / n_fits:14.0f} {iterations / n_fits:15.2f} "
+              f"{nfev / n_fits:9.1f}")
+
+if __name__ == "__main__":
+    main()
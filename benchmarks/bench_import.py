@@ -0,0 +1,56 @@
+# bench_import.py
+#
+# Import-time benchmark for sbnd_style.
+# Compares importing the module for its colour constants only against importing
+# it and activating the full style (pyplot, colormaps, rcParams), which is what
+# every `import sbnd_style` used to cost.
+#
+# Each measurement runs in a fresh interpreter so module caches do not hide the cost.
+#
+#     python benchmarks/bench_import.py [--repeat N]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    'constants only': "import sbnd_style; sbnd_style.OKABE_ITO_COLOR_CYCLE",
+    'palettes': "import sbnd_style; sbnd_style.SEA_PALETTE",
+    'full style': "import sbnd_style; sbnd_style.set_sbnd_style()",
+}
+
+TIMER = (
+    "import time; _t0 = time.perf_counter(); {stmt}; "
+    "import sys; print(time.perf_counter() - _t0, int('matplotlib.pyplot' in sys.modules))"
+)
+
+def time_case(stmt, repeat):
+    """Run `stmt` in `repeat` fresh interpreters and return (timings, pyplot_loaded)."""
+    timings = []
+    pyplot_loaded = False
+    env = dict(os.environ, MPLBACKEND='Agg')
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', TIMER.format(stmt=stmt)],
+                             cwd=REPO_DIR, env=env, check=True,
+                             capture_output=True, text=True).stdout.split()
+        timings.append(float(out[0]))
+        pyplot_loaded = bool(int(out[1]))
+    return timings, pyplot_loaded
+
+def main():
+    parser = argparse.ArgumentParser(description='sbnd_style import-time benchmark')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'case':<16} {'median [ms]':>12} {'min [ms]':>10}  pyplot imported")
+    for name, stmt in CASES.items():
+        timings, pyplot_loaded = time_case(stmt, args.repeat)
+        print(f"{name:<16} {1e3 * statistics.median(timings):12.1f} "
+              f"{1e3 * min(timings):10.1f}  {pyplot_loaded}")
+
+if __name__ == "__main__":
+    main()
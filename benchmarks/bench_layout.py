@@ -0,0 +1,79 @@
+# bench_layout.py
+#
+# Batch-render figures of the same shape (one_d_hist_example, data/MC ratio and
+# 2D-with-colorbar layouts) and compare the cost of laying them out with
+# tight_layout on every figure, sbnd_style.apply_layout (solved once, then
+# cached) and apply_layout(solve=False) (fixed preset margins). Only the
+# layout call is timed; the figures are drawn to PNG once each so tick labels
+# are realistic.
+#
+#     python benchmarks/bench_layout.py [--figures 50] [--save-dir DIR]
+
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sbnd_style
+from sbnd_hist import SBNDHist2D
+
+def make_figure(preset, rng):
+    """A figure of the given preset's shape filled with fresh random data."""
+    if preset == 'ratio':
+        counts, edges = np.histogram(rng.normal(size=1000), bins=40, range=(-5, 5))
+        plot = sbnd_style.RatioPlot(watermark='preliminary')
+        plot.plot((counts, edges), np.full(40, counts.mean()))
+        plot.ax_main.set_ylabel("y label")
+        plot.ax_ratio.set_xlabel("x label")
+        return plot.fig
+    fig, ax = plt.subplots()
+    if preset == 'single':
+        counts, edges = np.histogram(rng.normal(size=1000), bins=20, range=(-5, 5))
+        sbnd_style.hist_step(ax, counts, edges, label='MC')
+        ax.legend()
+    else:
+        hist = SBNDHist2D((100, 120), range=[[-5, 5], [-5, 7]])
+        hist.fill(rng.normal(size=10000), rng.normal(size=10000))
+        hist.plot(ax)
+    ax.set_xlabel("x label")
+    ax.set_ylabel("y label")
+    sbnd_style.wip(ax)
+    return fig
+
+def main():
+    parser = argparse.ArgumentParser(description='tight_layout vs cached layout presets')
+    parser.add_argument('--figures', type=int, default=50)
+    parser.add_argument('--save-dir', help="also save the last figure of each method here")
+    args = parser.parse_args()
+    sbnd_style.set_sbnd_style()
+
+    methods = {
+        'tight_layout': lambda fig, preset: fig.tight_layout(),
+        'apply_layout': lambda fig, preset: sbnd_style.apply_layout(fig, preset),
+        'solve=False': lambda fig, preset: sbnd_style.apply_layout(fig, preset, solve=False),
+    }
+    print(f"{'preset':<10} " + ' '.join(f"{m + ' [ms]':>18}" for m in methods))
+    for preset in sbnd_style.LAYOUT_PRESETS:
+        times = []
+        for method, layout in methods.items():
+            rng = np.random.default_rng(0)
+            elapsed = 0.0
+            for i in range(args.figures):
+                fig = make_figure(preset, rng)
+                t0 = time.perf_counter()
+                layout(fig, preset)
+                elapsed += time.perf_counter() - t0
+                if args.save_dir and i == args.figures - 1:
+                    fig.savefig(os.path.join(args.save_dir, f"layout_{preset}_{method}.png"))
+                plt.close(fig)
+            times.append(elapsed / args.figures)
+        print(f"{preset:<10} " + ' '.join(f"{1e3 * t:18.2f}" for t in times))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench_save.py
+#
+# Render a batch of monitoring-style figures (2D histogram with colorbar plus
+# a 1D histogram) at high DPI and write them as PNG with fig.savefig, and with
+# sbnd_style.save at several zlib compression levels, encoding in the calling
+# thread or in the background thread pool (overlapping with rendering of the
+# next figure). Reports time per figure and the mean file size.
+#
+#     python benchmarks/bench_save.py [--figures 10] [--dpi 200] [--workers 2]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sbnd_style
+from sbnd_hist import SBNDHist1D, SBNDHist2D
+
+def make_figure(rng):
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    x, y = rng.normal(0, 1.5, 200000), rng.normal(0, 2, 200000)
+    SBNDHist2D((200, 240), range=((-5, 5), (-5, 7))).fill(x, y).plot(ax1)
+    SBNDHist1D(100, range=(-5, 5)).fill(x).plot(ax2)
+    sbnd_style.wip(ax1)
+    return fig
+
+def run(out_dir, n_figures, save):
+    rng = np.random.default_rng(0)
+    t0 = time.perf_counter()
+    for i in range(n_figures):
+        fig = make_figure(rng)
+        save(fig, os.path.join(out_dir, f"fig{i}.png"))
+    sbnd_style.wait_saves()
+    elapsed = time.perf_counter() - t0
+    sizes = [os.path.getsize(os.path.join(out_dir, f"fig{i}.png")) for i in range(n_figures)]
+    return elapsed / n_figures, np.mean(sizes)
+
+def main():
+    parser = argparse.ArgumentParser(description='PNG saving: savefig vs sbnd_style.save')
+    parser.add_argument('--figures', type=int, default=10)
+    parser.add_argument('--dpi', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=sbnd_style.SAVE_WORKERS)
+    args = parser.parse_args()
+    sbnd_style.set_sbnd_style()
+    sbnd_style.SAVE_WORKERS = args.workers
+
+    def savefig(fig, path):
+        fig.savefig(path, dpi=args.dpi)
+        plt.close(fig)
+
+    cases = {'fig.savefig': savefig}
+    for level in (1, 6):
+        for background in (False, True):
+            name = f"save level={level} {'background' if background else 'inline'}"
+            cases[name] = (lambda level, background: lambda fig, path: sbnd_style.save(
+                fig, path, dpi=args.dpi, compress_level=level, background=background,
+                close=True))(level, background)
+
+    print(f"{args.figures} figures at {args.dpi} dpi, {os.cpu_count()} CPUs")
+    print(f"{'method':<30} {'per figure [ms]':>16} {'size [kB]':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, save in cases.items():
+            per_figure, size = run(tmp, args.figures, save)
+            print(f"{name:<30} {1e3 * per_figure:16.1f} {size / 1e3:10.1f}")
+
+if __name__ == "__main__":
+    main()
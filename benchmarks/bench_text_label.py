@@ -0,0 +1,127 @@
+# bench_text_label.py
+#
+# Micro-benchmark for the text_label watermark cache.
+# Draws a grid of axes, each with a wip() label, and compares plain ax.text
+# mathtext with the cached Agg path (text_label(..., cached=True), the default)
+# and with a single figure-level watermark(..., figure_level=True) artist.
+# Before timing, the cached paths are checked to give the same pixels as
+# ax.text for several dpi values, alignments and layouts (none, tight_layout,
+# constrained), on first draw and on redraw.
+#
+#     python benchmarks/bench_text_label.py [--grid 10] [--repeat 5]
+
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sbnd_style
+
+LABELLERS = {
+    'ax.text': lambda axes: [sbnd_style.wip(ax, cached=False) for ax in axes.flat],
+    'cached': lambda axes: [sbnd_style.wip(ax) for ax in axes.flat],
+    'watermark': lambda axes: sbnd_style.watermark(axes, 'wip'),
+    'figure': lambda axes: sbnd_style.watermark(axes, 'wip', figure_level=True),
+}
+
+ALIGNMENTS = [
+    {},
+    {'x': 0.5, 'y': 0.5, 'ha': 'center', 'va': 'center'},
+    {'x': 0.95, 'y': 0.05, 'ha': 'right', 'va': 'bottom'},
+    {'x': 0.3, 'y': 0.6, 'va': 'baseline'},
+]
+
+# Layout passes draw the figure with the renderer's draw_* methods disabled;
+# labels must not cache (or replay) anything during them.
+LAYOUTS = ['none', 'tight_layout', 'constrained']
+
+def render(labeller, dpi, alignment, layout='none'):
+    """RGBA pixels of a 2 x 2 grid labelled by `labeller`, after two draws."""
+    fig, axes = plt.subplots(2, 2, dpi=dpi,
+                             layout='constrained' if layout == 'constrained' else None)
+    for ax in axes.flat:
+        ax.set_axis_off()
+    if labeller.startswith('figure'):
+        sbnd_style.watermark(axes, 'wip', figure_level=True,
+                             cached=labeller == 'figure', **alignment)
+    elif labeller == 'watermark':
+        sbnd_style.watermark(axes, 'wip', **alignment)
+    else:
+        for ax in axes.flat:
+            sbnd_style.wip(ax, cached=labeller == 'cached', **alignment)
+    if layout == 'tight_layout':
+        fig.tight_layout()
+    fig.canvas.draw()
+    fig.canvas.draw()
+    pixels = np.asarray(fig.canvas.buffer_rgba()).copy()
+    plt.close(fig)
+    return pixels
+
+def check_pixels():
+    """Assert that the cached labels are pixel-identical to uncached ones."""
+    for layout in LAYOUTS:
+        for dpi in (72, 100, 150, 300):
+            for alignment in ALIGNMENTS:
+                sbnd_style._raster_cache.clear()
+                # The figure-level artist is not part of the axes' extents that
+                # layouts make room for, so it is compared with its uncached self.
+                references = {'ax.text': render('ax.text', dpi, alignment, layout),
+                              'figure(cached=False)': render('figure(cached=False)', dpi,
+                                                             alignment, layout)}
+                # Twice: the second figure replays the images cached by the first.
+                for labeller, reference in (('cached', 'ax.text'), ('cached', 'ax.text'),
+                                            ('watermark', 'ax.text'),
+                                            ('figure', 'figure(cached=False)'),
+                                            ('figure', 'figure(cached=False)')):
+                    differ = (render(labeller, dpi, alignment, layout)
+                              != references[reference]).any(axis=-1).sum()
+                    assert differ == 0, (f"{labeller} label differs from {reference} in {differ} "
+                                         f"pixels at dpi={dpi}, {alignment}, layout={layout}")
+    assert all(sbnd_style._raster_cache.values()), "empty recording cached"
+    print("cached labels match uncached ones pixel for pixel")
+
+def label_draw_time(grid, labeller, repeat):
+    """Return (seconds to add the labels, seconds per draw spent on the labels)."""
+    fig, axes = plt.subplots(grid, grid, figsize=(2 * grid, 2 * grid))
+    for ax in axes.flat:
+        ax.set_axis_off()
+
+    def draw_time():
+        fig.canvas.draw()  # warm up layout and font caches
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fig.canvas.draw()
+        return (time.perf_counter() - t0) / repeat
+
+    baseline = draw_time()
+    t0 = time.perf_counter()
+    labeller(axes)
+    add_time = time.perf_counter() - t0
+    labelled = draw_time()
+    plt.close(fig)
+    return add_time, labelled - baseline
+
+def main():
+    parser = argparse.ArgumentParser(description='text_label render-cache benchmark')
+    parser.add_argument('--grid', type=int, default=10, help='grid x grid axes')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    sbnd_style.set_sbnd_style()
+    check_pixels()
+    n_labels = args.grid ** 2
+    print(f"{n_labels} labels")
+    print(f"{'path':<10} {'add [ms]':>9} {'draw [ms]':>10} {'per label [us]':>15}")
+    for name, labeller in LABELLERS.items():
+        add_time, draw_time = label_draw_time(args.grid, labeller, args.repeat)
+        print(f"{name:<10} {1e3 * add_time:9.2f} "
+              f"{1e3 * draw_time:10.2f} {1e6 * draw_time / n_labels:15.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# check_cmap_registration.py
+#
+# Checks that SBND colormap registration is lazy and idempotent, and reports
+# the import cost:
+#   - importing sbnd_style registers nothing and does not import Matplotlib;
+#   - repeated importlib.reload + set_sbnd_style (notebooks) does not raise
+#     and leaves one unchanged colormap per name;
+#   - forked worker processes can apply the style and use the palettes again;
+#   - a palette whose colours change between reloads is re-registered;
+#   - the lookup tables equal LinearSegmentedColormap.from_list exactly, as
+#     floats and as uint8 (bytes=True).
+# Exits with status 1 if any check fails.
+#
+#     python benchmarks/check_cmap_registration.py [--repeat N]
+
+import argparse
+import importlib
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+IMPORT_STMT = (
+    "import sys, time; t0 = time.perf_counter(); import sbnd_style; "
+    "t = time.perf_counter() - t0; print(t, int('matplotlib' in sys.modules))"
+)
+
+def import_cost(repeat):
+    """Median import time in fresh interpreters and whether Matplotlib got imported."""
+    timings, mpl_loaded = [], False
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', IMPORT_STMT], cwd=REPO_DIR,
+                             check=True, capture_output=True, text=True).stdout.split()
+        timings.append(float(out[0]))
+        mpl_loaded |= bool(int(out[1]))
+    return statistics.median(timings), mpl_loaded
+
+def _worker(_):
+    import matplotlib
+    import sbnd_style
+    sbnd_style.set_sbnd_style()
+    importlib.reload(sbnd_style).set_sbnd_style()
+    return matplotlib.colormaps['sbnd_sea'] == sbnd_style.SEA_PALETTE
+
+def main():
+    parser = argparse.ArgumentParser(description='colormap registration checks')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    failures = []
+
+    def check(name, ok):
+        print(f"{'ok' if ok else 'FAIL':<5} {name}")
+        if not ok:
+            failures.append(name)
+
+    seconds, mpl_loaded = import_cost(args.repeat)
+    print(f"import sbnd_style: {1e3 * seconds:.1f} ms (median of {args.repeat})")
+    check("import does not load Matplotlib", not mpl_loaded)
+
+    import matplotlib
+    import sbnd_style
+    check("nothing registered before first use", 'sbnd_sea' not in matplotlib.colormaps)
+    sbnd_style.set_sbnd_style()
+    reference = matplotlib.colormaps['sbnd_sea']
+
+    import numpy as np
+    from matplotlib.colors import LinearSegmentedColormap
+    for name, colors in sbnd_style._PALETTE_COLORS.values():
+        expected = LinearSegmentedColormap.from_list(name, colors, N=sbnd_style.LUT_SIZE)
+        index = np.arange(sbnd_style.LUT_SIZE)
+        check(f"{name} table equals from_list",
+              np.array_equal(sbnd_style.palette_lut(name), expected(index))
+              and np.array_equal(sbnd_style.palette_lut(name, bytes=True),
+                                 expected(index, bytes=True))
+              and np.array_equal(matplotlib.colormaps[name](index, bytes=True),
+                                 expected(index, bytes=True)))
+
+    try:
+        for _ in range(3):
+            sbnd_style = importlib.reload(sbnd_style)
+            sbnd_style.set_sbnd_style(raster_threshold=1000)
+            sbnd_style.SYMMETRIC_PALETTE
+        reloaded = True
+    except ValueError:
+        reloaded = False
+    check("reload + set_sbnd_style does not raise", reloaded)
+    check("colormap unchanged after reload", matplotlib.colormaps['sbnd_sea'] == reference)
+    from matplotlib.figure import Figure
+    check("raster policy wrapped once after reload",
+          not hasattr(Figure.draw._sbnd_original, '_sbnd_original'))
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context('fork').Pool(2) as pool:
+            check("forked workers re-apply the style", all(pool.map(_worker, range(4))))
+
+    sbnd_style._PALETTE_COLORS['SEA_PALETTE'] = ('sbnd_sea', [(1, 1, 1), (0, 0, 0)])
+    sbnd_style._palettes.clear()
+    sbnd_style._luts.clear()
+    sbnd_style.SEA_PALETTE
+    check("changed palette is re-registered", matplotlib.colormaps['sbnd_sea'] != reference)
+    importlib.reload(sbnd_style).set_sbnd_style()
+    check("reload restores the palette", matplotlib.colormaps['sbnd_sea'] == reference)
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
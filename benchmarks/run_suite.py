@@ -0,0 +1,173 @@
+# run_suite.py
+#
+# Run the asv-style benchmarks in suite.py and save the timings as JSON, or
+# compare two saved result files to spot regressions between commits.
+#
+# Every benchmark is run once per parameter combination: setup, one warm-up
+# call, then `--repeat` samples. Each sample times enough calls to last at
+# least `--min-time` seconds (asv's "number"), and the median and minimum time
+# per call are stored.
+#
+#     python benchmarks/run_suite.py                      # -> benchmarks/results/<commit>.json
+#     python benchmarks/run_suite.py -b TimeSavefig -b 'TimeHistFill.*1000000'
+#     python benchmarks/run_suite.py --quick              # events <= 1e5, 1 sample
+#     python benchmarks/run_suite.py --compare old.json new.json [--factor 1.1]
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+def git_commit():
+    """Short hash of HEAD, with '+' if the tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('+' if dirty else '')
+
+def benchmarks(module):
+    """Yield (name, class, method name, param_names, param combinations)."""
+    for cls_name, cls in vars(module).items():
+        if not (isinstance(cls, type) and cls_name.startswith('Time')):
+            continue
+        params = getattr(cls, 'params', [])
+        if params and not isinstance(params, tuple):
+            params = (params,)
+        combos = list(itertools.product(*params)) if params else [()]
+        for method in sorted(m for m in vars(cls) if m.startswith('time_')):
+            yield f"{cls_name}.{method}", cls, method, list(getattr(cls, 'param_names', [])), combos
+
+def time_call(func, min_time, repeat):
+    """Per-call timings of `repeat` samples, each lasting at least `min_time`."""
+    func()  # warm-up (caches, lazy imports)
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= max(2, min(10, int(min_time / max(elapsed, 1e-9))))
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - t0) / number)
+    return samples, number
+
+def run(args):
+    sys.path.insert(0, BENCH_DIR)
+    import numpy
+    import matplotlib
+    import suite
+
+    results = {}
+    patterns = [re.compile(b) for b in args.bench]
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            for name, cls, method, names, combos in benchmarks(suite):
+                for combo in combos:
+                    key = f"{name}({', '.join(map(str, combo))})" if combo else name
+                    if patterns and not any(p.search(key) for p in patterns):
+                        continue
+                    if args.quick and any(isinstance(v, int) and v > 10**5
+                                          for n, v in zip(names, combo) if n == 'events'):
+                        continue
+                    bench = cls()
+                    try:
+                        if hasattr(bench, 'setup'):
+                            bench.setup(*combo)
+                        samples, number = time_call(lambda: getattr(bench, method)(*combo),
+                                                    args.min_time, args.repeat)
+                    finally:
+                        if hasattr(bench, 'teardown'):
+                            bench.teardown(*combo)
+                    results[key] = {
+                        'benchmark': name,
+                        'params': dict(zip(names, combo)),
+                        'median': statistics.median(samples),
+                        'min': min(samples),
+                        'samples': len(samples),
+                        'number': number,
+                    }
+                    print(f"{key:<60} {1e3 * results[key]['median']:12.3f} ms", flush=True)
+        finally:
+            os.chdir(cwd)
+
+    commit = git_commit()
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'machine': {'platform': platform.platform(), 'processor': platform.processor(),
+                        'cpu_count': os.cpu_count()},
+            'versions': {'python': platform.python_version(), 'numpy': numpy.__version__,
+                         'matplotlib': matplotlib.__version__},
+            'results': results,
+        }, f, indent=1)
+    print(f"Results written to {output}")
+
+def compare(old_path, new_path, factor):
+    """Print new/old median ratios; return the number of regressions beyond `factor`."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['commit']} -> {new['commit']}")
+    print(f"{'benchmark':<60} {'old [ms]':>10} {'new [ms]':>10} {'ratio':>7}")
+    regressions = 0
+    for key in sorted(set(old['results']) & set(new['results'])):
+        t_old, t_new = old['results'][key]['median'], new['results'][key]['median']
+        ratio = t_new / t_old
+        flag = ''
+        if ratio > factor:
+            flag, regressions = '  slower', regressions + 1
+        elif ratio < 1 / factor:
+            flag = '  faster'
+        print(f"{key:<60} {1e3 * t_old:10.3f} {1e3 * t_new:10.3f} {ratio:7.2f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='SBND plotting benchmark suite')
+    parser.add_argument('-b', '--bench', action='append', default=[],
+                        help="regex selecting benchmarks, e.g. 'TimeSavefig' (repeatable)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help="minimum duration of one sample [s]")
+    parser.add_argument('--quick', action='store_true',
+                        help="skip event counts above 1e5 and take a single sample")
+    parser.add_argument('-o', '--output', help="JSON file (default: results/<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'))
+    parser.add_argument('--factor', type=float, default=1.1,
+                        help="ratio beyond which --compare reports a change")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.factor) else 0)
+    if args.quick:
+        args.repeat, args.min_time = 1, 0
+    run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# suite.py
+#
+# Benchmark definitions for run_suite.py, written in the asv style: every class
+# groups benchmarks sharing a setup; methods named time_* are timed once per
+# combination of `params` (named by `param_names`), after setup(*params) and
+# before teardown(*params). Module-level data is built lazily so that only the
+# selected benchmarks pay for it.
+#
+# The *_example functions of test.py write their PNGs into the current
+# directory, so run_suite.py runs everything from a temporary directory.
+
+import importlib.util
+import inspect
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+import sbnd_style
+from sbnd_hist import SBNDHist1D, SBNDHist2D, imshow2d
+
+# test.py by path: `import test` could pick up the standard library package.
+_spec = importlib.util.spec_from_file_location('sbnd_examples', os.path.join(REPO_DIR, 'test.py'))
+examples = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(examples)
+
+EVENTS = [10**3, 10**4, 10**5, 10**6, 10**7]
+BINS = [20, 100, 1000]
+
+_events = {}
+
+def events(n):
+    """Cached (x, y) correlated Gaussian events, as in two_d_example."""
+    if n not in _events:
+        rng = np.random.default_rng(n)
+        x = rng.normal(0, np.sqrt(2), n)
+        _events[n] = (x, -0.75 * x + rng.normal(0, np.sqrt(1.875), n))
+    return _events[n]
+
+class TimeStyle:
+    def time_set_sbnd_style(self):
+        sbnd_style.set_sbnd_style()
+
+    def time_style_context(self):
+        with sbnd_style.style():
+            pass
+
+class TimeTextLabel:
+    params = ['ax.text', 'text_label', 'text_label(cached=False)']
+    param_names = ['label']
+
+    def setup(self, label):
+        sbnd_style.set_sbnd_style()
+        self.fig, self.ax = plt.subplots()
+        self.fig.canvas.draw()
+
+    def teardown(self, label):
+        plt.close(self.fig)
+
+    def time_label_and_draw(self, label):
+        """Add one watermark-style label and redraw the figure."""
+        if label == 'ax.text':
+            artist = self.ax.text(0.05, 0.95, r"$\mathbf{SBND}\;Work\;in\;Progress$",
+                                  transform=self.ax.transAxes, ha='left', va='top')
+        else:
+            artist = sbnd_style.wip(self.ax, cached=label == 'text_label')
+        self.fig.canvas.draw()
+        artist.remove()
+
+class TimeExamples:
+    params = [name for name, _ in inspect.getmembers(examples, inspect.isfunction)
+              if name.endswith('_example')]
+    param_names = ['example']
+
+    def setup(self, example):
+        sbnd_style.set_sbnd_style()
+        self.datasets = examples.gauss_hists()
+
+    def teardown(self, example):
+        plt.close('all')
+
+    def time_example(self, example):
+        func = getattr(examples, example)
+        func(*([self.datasets] if inspect.signature(func).parameters else []))
+
+class TimeHistFill:
+    params = (EVENTS, BINS)
+    param_names = ['events', 'bins']
+
+    def setup(self, n, bins):
+        self.x, self.y = events(n)
+
+    def time_fill_1d(self, n, bins):
+        SBNDHist1D(bins, range=(-5, 5)).fill(self.x)
+
+    def time_fill_2d(self, n, bins):
+        SBNDHist2D(bins, range=((-5, 5), (-5, 7))).fill(self.x, self.y)
+
+    def time_np_histogram2d(self, n, bins):
+        np.histogram2d(self.x, self.y, bins=bins, range=((-5, 5), (-5, 7)))
+
+class TimeHistDraw:
+    params = (EVENTS, BINS)
+    param_names = ['events', 'bins']
+
+    def setup(self, n, bins):
+        sbnd_style.set_sbnd_style()
+        x, y = events(n)
+        self.h1 = SBNDHist1D(bins, range=(-5, 5)).fill(x)
+        self.h2 = SBNDHist2D(bins, range=((-5, 5), (-5, 7))).fill(x, y)
+        self.fig, self.ax = plt.subplots()
+
+    def teardown(self, n, bins):
+        plt.close(self.fig)
+
+    def time_hist_step(self, n, bins):
+        self.ax.clear()
+        self.h1.plot(self.ax)
+        self.fig.canvas.draw()
+
+    def time_pcolormesh_contour(self, n, bins):
+        self.ax.clear()
+        self.h2.plot(self.ax, colorbar=False)
+        self.h2.contour(self.ax)
+        self.fig.canvas.draw()
+
+    def time_imshow_contour(self, n, bins):
+        self.ax.clear()
+        imshow2d(self.ax, self.h2.counts, self.h2.xedges, self.h2.yedges, colorbar=False)
+        self.h2.contour(self.ax, factors='auto')
+        self.fig.canvas.draw()
+
+class TimeSavefig:
+    params = ([72, 100, 300], ['png', 'pdf', 'svg'], BINS)
+    param_names = ['dpi', 'format', 'bins']
+
+    def setup(self, dpi, fmt, bins):
+        sbnd_style.set_sbnd_style()
+        x, y = events(10**5)
+        self.fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+        SBNDHist1D(bins, range=(-5, 5)).fill(x).plot(ax1)
+        SBNDHist2D(bins, range=((-5, 5), (-5, 7))).fill(x, y).plot(ax2)
+        sbnd_style.wip(ax1)
+        self.path = f"bench_savefig.{fmt}"
+
+    def teardown(self, dpi, fmt, bins):
+        plt.close(self.fig)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def time_savefig(self, dpi, fmt, bins):
+        self.fig.savefig(self.path, dpi=dpi)
@@ -0,0 +1,594 @@
+# sbnd_hist.py
+#
+# Fixed-binning histogram accumulators for data that does not fit in memory.
+# Events are filled chunk by chunk; only the per-bin sum of weights and sum of
+# squared weights are kept, so memory is set by the number of bins.
+#
+# SBNDStack keeps the components of a stacked histogram binned once each.
+#
+# Bin contents are stored with an underflow and an overflow bin on each axis
+# (index 0 and -1, as in ROOT). Filling uses histogram_fill, which computes bin
+# indices arithmetically for uniform binning and counts them with np.bincount.
+#
+#     h = SBNDHist1D(40, range=(-5, 5))
+#     for chunk in chunks:
+#         h.fill(chunk["x"], weights=chunk["w"])
+#     h.plot(ax, histtype='errorbar')
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import sbnd_style
+
+def _make_edges(bins, range):
+    """Bin edges from an int + range (as np.histogram) or an explicit edge array."""
+    if np.ndim(bins) == 0:
+        if range is None:
+            raise ValueError("A range is required when bins is a number: the "
+                             "binning must be fixed before the first fill")
+        return np.linspace(range[0], range[1], int(bins) + 1)
+    edges = np.asarray(bins, dtype=float)
+    if edges.ndim != 1 or edges.size < 2 or np.any(np.diff(edges) <= 0):
+        raise ValueError("bins must be a number or a 1D increasing array of edges")
+    return edges
+
+def _uniform_binning(edges):
+    """Returns (low, high, bins per unit) if the edges are evenly spaced, else None."""
+    widths = np.diff(edges)
+    if np.allclose(widths, widths[0], rtol=1e-9, atol=0):
+        return edges[0], edges[-1], (len(edges) - 1) / (edges[-1] - edges[0])
+    return None
+
+def bin_indices(x, edges):
+    """
+    Flow-bin index of every value in `x`.
+
+    Returns an intp array with 0 for underflow, 1..n for the n bins and n + 1
+    for overflow and NaN. As in np.histogram, bins are half-open except the
+    last, which includes the upper edge.
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    n = len(edges) - 1
+    uniform = _uniform_binning(edges)
+    if uniform is None:
+        idx = np.searchsorted(edges, x, side='right')
+    else:
+        low, high, scale = uniform
+        f = x - low
+        f *= scale
+        b = np.floor(f)
+        # Rounding in (x - low) * scale can put values lying on an edge one bin
+        # off. Re-check the values close to an edge against the edge array, as
+        # np.histogram does.
+        with np.errstate(invalid='ignore'):  # inf - inf
+            f -= b
+        tol = 64 * np.finfo(float).eps * max(abs(low), abs(high), high - low) * scale
+        near = np.flatnonzero((f < tol) | (f > 1 - tol))
+        np.clip(b, -1, n, out=b)
+        np.nan_to_num(b, copy=False, nan=n)
+        idx = b.astype(np.intp)
+        idx += 1
+        if len(near):
+            bounds = np.concatenate(([-np.inf], edges, [np.inf]))
+            i, xn = idx[near], x[near]
+            i -= xn < bounds[i]
+            i += (xn >= bounds[i + 1]) & (i <= n)
+            idx[near] = i
+    idx[x == edges[-1]] = n
+    return idx
+
+def _fill_serial(coords, edges, weights):
+    """histogram_fill on one thread."""
+    shape = tuple(len(e) + 1 for e in edges)
+    flat = bin_indices(coords[0], edges[0])
+    for c, e, n in zip(coords[1:], edges[1:], shape[1:]):
+        flat *= n
+        flat += bin_indices(c, e)
+
+    size = int(np.prod(shape))
+    if weights is None:
+        sumw = np.bincount(flat, minlength=size).astype(float).reshape(shape)
+        return sumw, sumw.copy()
+    sumw = np.bincount(flat, weights=weights, minlength=size).reshape(shape)
+    sumw2 = np.bincount(flat, weights=weights * weights, minlength=size).reshape(shape)
+    return sumw, sumw2
+
+# Parallel fills split the input into chunks of at least _MIN_CHUNK entries
+# (smaller ones aren't worth a thread) and at most _MAX_CHUNK (to keep the
+# per-chunk index temporaries small).
+_MIN_CHUNK = 1 << 16
+_MAX_CHUNK = 1 << 22
+_thread_pools = {}
+
+def _thread_pool(n_threads):
+    """Shared ThreadPoolExecutor per thread count, created on first use."""
+    if n_threads not in _thread_pools:
+        _thread_pools[n_threads] = ThreadPoolExecutor(max_workers=n_threads,
+                                                      thread_name_prefix='sbnd_hist')
+    return _thread_pools[n_threads]
+
+def histogram_fill(coords, edges, weights=None, n_threads=1):
+    """
+    Fill an N-dimensional histogram including under/overflow bins.
+
+    Args:
+        coords (sequence): One 1D array of values per dimension.
+        edges (sequence): One array of bin edges per dimension.
+        weights (array): Optional per-entry weights.
+        n_threads (int): Fill chunks of the input in this many threads and sum
+            the partial histograms (0: one per CPU). NumPy releases the GIL
+            for the index and bincount work, so this scales with cores.
+
+    Returns:
+        (sumw, sumw2) float arrays of shape (n_1 + 2, ..., n_d + 2).
+    """
+    coords = [np.asarray(c, dtype=float).ravel() for c in coords]
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float).ravel()
+    if n_threads == 0:
+        n_threads = os.cpu_count() or 1
+
+    n_entries = len(coords[0])
+    if n_threads <= 1 or n_entries < 2 * _MIN_CHUNK:
+        return _fill_serial(coords, edges, weights)
+
+    chunk = min(max(-(-n_entries // n_threads), _MIN_CHUNK), _MAX_CHUNK)
+    def fill_chunk(start):
+        stop = start + chunk
+        return _fill_serial([c[start:stop] for c in coords], edges,
+                            None if weights is None else weights[start:stop])
+
+    sumw = sumw2 = None
+    for part_w, part_w2 in _thread_pool(n_threads).map(fill_chunk, range(0, n_entries, chunk)):
+        if sumw is None:
+            sumw, sumw2 = part_w, part_w2
+        else:
+            sumw += part_w
+            sumw2 += part_w2
+    return sumw, sumw2
+
+# Probability content of the 1, 2 and 3 sigma regions used for contours.
+SIGMA_PROBS = (0.682, 0.954, 0.997)
+
+def credible_levels(counts, probs=SIGMA_PROBS):
+    """
+    Highest-density levels enclosing the fractions `probs` of the total.
+
+    For each p, returns the bin content t such that the bins with content >= t
+    hold at least p of the total (the same levels as sorting all bins in
+    descending order and cumulating). Instead of a full sort, bins are bucketed
+    by value; only the bucket where the cumulative sum crosses p is sorted.
+
+    Args:
+        counts (array): Bin contents (any shape, non-negative).
+        probs (sequence): Enclosed fractions in [0, 1].
+
+    Returns:
+        Array of levels, one per entry of `probs`.
+    """
+    flat = np.asarray(counts, dtype=float).ravel()
+    total = flat.sum()
+    vmin, vmax = flat.min(), flat.max()
+    if vmax == vmin:
+        return np.full(len(probs), vmax)
+
+    # Value buckets, highest first: bucket 0 holds the largest bin contents.
+    n_buckets = max(int(np.sqrt(flat.size)), 1)
+    scaled = np.subtract(vmax, flat)
+    scaled *= n_buckets / (vmax - vmin)
+    bucket = scaled.astype(np.intp)
+    del scaled
+    np.minimum(bucket, n_buckets - 1, out=bucket)
+    cum_mass = np.cumsum(np.bincount(bucket, weights=flat, minlength=n_buckets))
+
+    levels = np.empty(len(probs))
+    sorted_buckets = {}
+    for i, p in enumerate(probs):
+        target = p * total
+        b = min(np.searchsorted(cum_mass, target), n_buckets - 1)
+        if b not in sorted_buckets:
+            in_bucket = flat[bucket == b]
+            # Integer counts often fill a bucket with one repeated value,
+            # which is then the level whatever the crossing point.
+            if in_bucket.min() != in_bucket.max():
+                in_bucket = -np.sort(-in_bucket)
+            sorted_buckets[b] = in_bucket
+        in_bucket = sorted_buckets[b]
+        if in_bucket[0] == in_bucket[-1]:
+            levels[i] = in_bucket[0]
+            continue
+        mass_above = cum_mass[b - 1] if b > 0 else 0.0
+        k = np.searchsorted(mass_above + np.cumsum(in_bucket), target)
+        levels[i] = in_bucket[min(k, in_bucket.size - 1)]
+    return levels
+
+def credible_contours(ax, counts, xedges, yedges, probs=SIGMA_PROBS,
+                      colors=None, linestyles=None, factors=None, **kwargs):
+    """
+    Draw highest-density credible contours of a 2D histogram.
+
+    Args:
+        ax (matplotlib.axes.Axes): The axes to draw on.
+        counts (array): Bin contents indexed [x, y], as from np.histogram2d.
+        xedges, yedges (array): Bin edges; contours are drawn at bin centres.
+        probs (sequence): Enclosed fractions, default 1/2/3 sigma.
+        colors, linestyles (list): Per contour, from the outermost (largest
+            probability) inwards. Defaults follow the SBND style.
+        factors (pair): If given, sum blocks of bins first (see pool2d) and
+            draw at the block centres, matching an imshow2d image with the
+            same factors. Uniform binning only.
+        **kwargs: Passed to ax.contour.
+    """
+    if colors is None:
+        colors = [sbnd_style.OKABE_ITO_YELLOW, sbnd_style.OKABE_ITO_ORANGE,
+                  sbnd_style.OKABE_ITO_RED_PURPLE]
+    if linestyles is None:
+        linestyles = ['dotted', 'dashed', 'solid']
+
+    if factors is not None:
+        counts = pool2d(counts, factors, 'sum')
+        xedges, yedges = pooled_edges(xedges, factors[0]), pooled_edges(yedges, factors[1])
+
+    # contour needs increasing levels: largest probability = lowest level first.
+    # Sparse integer counts can give equal levels; draw each level once.
+    levels, first = np.unique(np.sort(credible_levels(counts, probs)), return_index=True)
+    xcenters = 0.5 * (xedges[1:] + xedges[:-1])
+    ycenters = 0.5 * (yedges[1:] + yedges[:-1])
+    return ax.contour(xcenters, ycenters, np.asarray(counts).T, levels=levels,
+                      colors=[colors[i] for i in first],
+                      linestyles=[linestyles[i] for i in first], **kwargs)
+
+def pool2d(counts, factors, reduce='sum'):
+    """
+    Combine blocks of factors[0] x factors[1] bins of a 2D array.
+
+    The last block along an axis is smaller when the factor does not divide
+    the number of bins. reduce is 'sum', 'mean' (over the bins actually in
+    the block) or 'max'.
+    """
+    if reduce not in ('sum', 'mean', 'max'):
+        raise ValueError(f"Unknown reduce {reduce!r}; expected 'sum', 'mean' or 'max'")
+    ufunc = np.maximum if reduce == 'max' else np.add
+    pooled = np.asarray(counts)
+    for axis, factor in enumerate(factors):
+        if factor > 1:
+            pooled = ufunc.reduceat(pooled, np.arange(0, pooled.shape[axis], factor), axis=axis)
+    if reduce == 'mean':
+        nx, ny = np.shape(counts)
+        fx, fy = factors
+        pooled = pooled / np.outer(np.diff(np.minimum(np.arange(0, nx + fx, fx), nx)),
+                                   np.diff(np.minimum(np.arange(0, ny + fy, fy), ny)))
+    return pooled
+
+def pooled_edges(edges, factor):
+    """Uniform edges of pool2d blocks; the last one may extend past edges[-1]."""
+    n_blocks = -(-(len(edges) - 1) // factor)
+    width = (edges[-1] - edges[0]) / (len(edges) - 1) * factor
+    return edges[0] + width * np.arange(n_blocks + 1)
+
+def display_factors(ax, shape, dpi=None):
+    """
+    Pooling factors that bring a (nx, ny) grid down to the pixel size of `ax`.
+
+    The pooled grid keeps at least one block per output pixel. dpi defaults
+    to the figure dpi; pass the savefig dpi when saving at another resolution.
+    """
+    bbox = ax.get_window_extent()
+    scale = 1 if dpi is None else dpi / ax.figure.dpi
+    pixels = (max(1, int(bbox.width * scale)), max(1, int(bbox.height * scale)))
+    return tuple(max(1, n // p) for n, p in zip(shape, pixels))
+
+def imshow2d(ax, counts, xedges, yedges, reduce='mean', factors=None, dpi=None,
+             cmap=None, colorbar=True, label='Counts', **kwargs):
+    """
+    Draw a uniformly binned 2D histogram with imshow, pooled to the output resolution.
+
+    Args:
+        ax (matplotlib.axes.Axes): The axes to draw on.
+        counts (array): Bin contents indexed [x, y].
+        xedges, yedges (array): Uniform bin edges.
+        reduce (str): Pooling of the bins within one block: 'mean' or 'max'
+            (see pool2d).
+        factors (pair): Bins per block along x and y; by default
+            display_factors(ax, counts.shape, dpi).
+        dpi (float): Output resolution used for the default factors.
+        cmap: Colormap (default: the SBND sea palette).
+        colorbar (bool): Add a colorbar labelled `label`.
+        **kwargs: Passed to ax.imshow.
+
+    Returns the AxesImage; its pool_factors attribute holds the factors used,
+    to be passed on to credible_contours.
+    """
+    if _uniform_binning(xedges) is None or _uniform_binning(yedges) is None:
+        raise ValueError("imshow2d needs uniform binning; use pcolormesh for variable bins")
+    if factors is None:
+        factors = display_factors(ax, np.shape(counts), dpi)
+    image = pool2d(counts, factors, reduce)
+    px, py = pooled_edges(xedges, factors[0]), pooled_edges(yedges, factors[1])
+
+    kwargs.setdefault('interpolation', 'nearest')
+    kwargs.setdefault('aspect', 'auto')
+    im = ax.imshow(image.T, origin='lower', extent=(px[0], px[-1], py[0], py[-1]),
+                   cmap=sbnd_style.SEA_PALETTE if cmap is None else cmap, **kwargs)
+    im.pool_factors = tuple(factors)
+    # A partial last block extends past the histogram; keep the histogram range.
+    ax.set_xlim(xedges[0], xedges[-1])
+    ax.set_ylim(yedges[0], yedges[-1])
+    if colorbar:
+        ax.figure.colorbar(im, ax=ax, label=label)
+    return im
+
+class SBNDHist1D:
+    """
+    Streaming 1D histogram with sum-of-weights and sum-of-weights² storage.
+
+    `sumw` and `sumw2` include the underflow (index 0) and overflow (index -1)
+    bins; `counts` and `errors` cover only the in-range bins.
+
+    Args:
+        bins (int or array): Number of bins, or the bin edges.
+        range (tuple): (low, high) when `bins` is a number.
+        n_threads (int): Default thread count for fill (see histogram_fill).
+    """
+
+    def __init__(self, bins, range=None, n_threads=1):
+        self.edges = _make_edges(bins, range)
+        self.n_threads = n_threads
+        self.sumw = np.zeros(len(self.edges) + 1)
+        self.sumw2 = np.zeros(len(self.edges) + 1)
+
+    def fill(self, x, weights=None, n_threads=None):
+        """Add a chunk of values (and optional per-value weights).
+
+        n_threads overrides the histogram's default thread count when given.
+        """
+        n_threads = self.n_threads if n_threads is None else n_threads
+        sumw, sumw2 = histogram_fill([x], [self.edges], weights, n_threads)
+        self.sumw += sumw
+        self.sumw2 += sumw2
+        return self
+
+    @property
+    def counts(self):
+        """Sum of weights per in-range bin."""
+        return self.sumw[1:-1]
+
+    @property
+    def errors(self):
+        """Statistical uncertainty per in-range bin, sqrt(sum of weights²)."""
+        return np.sqrt(self.sumw2[1:-1])
+
+    @property
+    def variances(self):
+        """Sum of weights² per in-range bin."""
+        return self.sumw2[1:-1]
+
+    @property
+    def underflow(self):
+        """Sum of weights below the first edge."""
+        return self.sumw[0]
+
+    @property
+    def overflow(self):
+        """Sum of weights above the last edge (and NaN entries)."""
+        return self.sumw[-1]
+
+    @property
+    def centers(self):
+        return 0.5 * (self.edges[1:] + self.edges[:-1])
+
+    def plot(self, ax, histtype='step', **kwargs):
+        """
+        Draw the histogram on `ax`.
+
+        Args:
+            ax (matplotlib.axes.Axes): The axes to draw on.
+            histtype (str): 'step', 'stepfilled' or 'errorbar' (data points).
+            **kwargs: Passed to ax.stairs or ax.errorbar.
+        """
+        if histtype == 'errorbar':
+            kwargs.setdefault('fmt', 'o')
+            kwargs.setdefault('color', 'black')
+            return ax.errorbar(self.centers, self.counts, yerr=self.errors, **kwargs)
+        if histtype not in ('step', 'stepfilled'):
+            raise ValueError(f"Unknown histtype {histtype!r}")
+        return ax.stairs(self.counts, self.edges, fill=histtype == 'stepfilled', **kwargs)
+
+class SBNDHist2D:
+    """
+    Streaming 2D histogram with sum-of-weights and sum-of-weights² storage.
+
+    `sumw` and `sumw2` have shape (nx + 2, ny + 2) including the flow bins;
+    `counts` and `errors` cover only the in-range bins.
+
+    Args:
+        bins (int, array or pair): Bins for both axes, or (xbins, ybins).
+        range (pair): ((xlow, xhigh), (ylow, yhigh)) for numeric bins.
+        n_threads (int): Default thread count for fill (see histogram_fill).
+    """
+
+    def __init__(self, bins, range=None, n_threads=1):
+        xbins, ybins = (bins, bins) if np.ndim(bins) == 0 else bins
+        xrange, yrange = (None, None) if range is None else range
+        self.xedges = _make_edges(xbins, xrange)
+        self.yedges = _make_edges(ybins, yrange)
+        self.n_threads = n_threads
+        shape = (len(self.xedges) + 1, len(self.yedges) + 1)
+        self.sumw = np.zeros(shape)
+        self.sumw2 = np.zeros(shape)
+
+    def fill(self, x, y=None, weights=None, n_threads=None):
+        """Add a chunk of (x, y) pairs, given as two arrays or one (N, 2) array.
+
+        n_threads overrides the histogram's default thread count when given.
+        """
+        if y is None:
+            x, y = np.asarray(x).T
+        n_threads = self.n_threads if n_threads is None else n_threads
+        sumw, sumw2 = histogram_fill([x, y], [self.xedges, self.yedges], weights, n_threads)
+        self.sumw += sumw
+        self.sumw2 += sumw2
+        return self
+
+    @property
+    def counts(self):
+        """Sum of weights per in-range bin, indexed [x, y] like np.histogram2d."""
+        return self.sumw[1:-1, 1:-1]
+
+    @property
+    def errors(self):
+        """Statistical uncertainty per in-range bin, sqrt(sum of weights²)."""
+        return np.sqrt(self.sumw2[1:-1, 1:-1])
+
+    def plot(self, ax, cmap=None, colorbar=True, label='Counts', method='pcolormesh', **kwargs):
+        """
+        Draw the histogram on `ax` with pcolormesh.
+
+        Args:
+            ax (matplotlib.axes.Axes): The axes to draw on.
+            cmap: Colormap (default: the SBND sea palette).
+            colorbar (bool): Add a colorbar labelled `label`.
+            method (str): 'pcolormesh', or 'imshow' to pool large uniform
+                grids down to the output resolution (see imshow2d).
+            **kwargs: Passed to ax.pcolormesh, or to imshow2d.
+        """
+        if method == 'imshow':
+            return imshow2d(ax, self.counts, self.xedges, self.yedges, cmap=cmap,
+                            colorbar=colorbar, label=label, **kwargs)
+        if method != 'pcolormesh':
+            raise ValueError(f"Unknown method {method!r}; expected 'pcolormesh' or 'imshow'")
+        kwargs.setdefault('rasterized', True)
+        mesh = ax.pcolormesh(self.xedges, self.yedges, self.counts.T,
+                             cmap=sbnd_style.SEA_PALETTE if cmap is None else cmap,
+                             **kwargs)
+        if colorbar:
+            ax.figure.colorbar(mesh, ax=ax, label=label)
+        return mesh
+
+    def contour(self, ax, probs=SIGMA_PROBS, **kwargs):
+        """Draw highest-density credible contours; see credible_contours.
+
+        Pass factors='auto' to contour the same pooled grid that
+        plot(method='imshow') drew on this axes.
+        """
+        if kwargs.get('factors') == 'auto':
+            pooled = [im for im in ax.images if hasattr(im, 'pool_factors')]
+            kwargs['factors'] = (pooled[-1].pool_factors if pooled
+                                 else display_factors(ax, self.counts.shape))
+        return credible_contours(ax, self.counts, self.xedges, self.yedges, probs, **kwargs)
+
+class SBNDStack:
+    """
+    Stacked histogram of many components sharing one binning.
+
+    Each component is binned once (optionally several at a time in threads)
+    and kept as its own row of sum of weights; the stack is a single
+    np.cumsum over the (components, bins) array in the current order, so
+    components can be reordered or hidden without re-binning.
+
+        stack = SBNDStack(50, range=(-15, 15))
+        stack.fill({"CC": cc_x, "NC": nc_x, "Cosmics": cosmic_x}, n_threads=0)
+        stack.sort()                  # smallest component at the bottom
+        stack.plot(ax)
+
+    Args:
+        bins (int or array): Number of bins, or the bin edges.
+        range (tuple): (low, high) when `bins` is a number.
+    """
+
+    def __init__(self, bins, range=None):
+        self.edges = _make_edges(bins, range)
+        self.order = []
+        self._sumw = {}
+        self._sumw2 = {}
+        self._style = {}
+
+    def _set(self, name, sumw, sumw2, color, hatch):
+        if name not in self._sumw:
+            self.order.append(name)
+        self._sumw[name] = sumw
+        self._sumw2[name] = sumw2
+        self._style[name] = (color, hatch)
+
+    def add(self, name, values, weights=None, color=None, hatch=None):
+        """Bin one component and add it on top of the stack."""
+        sumw, sumw2 = histogram_fill([values], [self.edges], weights)
+        self._set(name, sumw[1:-1], sumw2[1:-1], color, hatch)
+        return self
+
+    def add_counts(self, name, counts, sumw2=None, color=None, hatch=None):
+        """Add an already-binned component."""
+        counts = np.asarray(counts, dtype=float)
+        self._set(name, counts, counts if sumw2 is None else np.asarray(sumw2, dtype=float),
+                  color, hatch)
+        return self
+
+    def fill(self, components, weights=None, colors=None, n_threads=1):
+        """
+        Bin several components, each in its own task of a thread pool.
+
+        Args:
+            components (dict): name -> values, stacked in insertion order.
+            weights (dict): Optional name -> per-value weights.
+            colors (dict): Optional name -> colour.
+            n_threads (int): Components binned concurrently (0: one per CPU).
+        """
+        weights = weights or {}
+        colors = colors or {}
+        names = list(components)
+
+        def bin_component(name):
+            sumw, sumw2 = histogram_fill([components[name]], [self.edges], weights.get(name))
+            return sumw[1:-1], sumw2[1:-1]
+
+        if n_threads == 0:
+            n_threads = os.cpu_count() or 1
+        if n_threads > 1 and len(names) > 1:
+            results = _thread_pool(n_threads).map(bin_component, names)
+        else:
+            results = map(bin_component, names)
+        for name, (sumw, sumw2) in zip(names, results):
+            self._set(name, sumw, sumw2, colors.get(name), None)
+        return self
+
+    def reorder(self, order):
+        """Set the stacking order (bottom first); names left out are hidden."""
+        unknown = set(order) - set(self._sumw)
+        if unknown:
+            raise KeyError(f"Unknown stack components: {sorted(unknown)}")
+        self.order = list(order)
+        return self
+
+    def sort(self, reverse=False):
+        """Order the visible components by integral, smallest at the bottom."""
+        return self.reorder(sorted(self.order, key=lambda name: self._sumw[name].sum(),
+                                   reverse=reverse))
+
+    @property
+    def counts(self):
+        """(components, bins) sum of weights in stacking order."""
+        return np.array([self._sumw[name] for name in self.order]).reshape(-1, len(self.edges) - 1)
+
+    @property
+    def cumulative(self):
+        """(components, bins) stacked contents: row i is the top of component i."""
+        return np.cumsum(self.counts, axis=0)
+
+    @property
+    def total(self):
+        """Sum of weights of the whole stack."""
+        return self.counts.sum(axis=0)
+
+    @property
+    def total_variances(self):
+        """Sum of weights² of the whole stack."""
+        return np.sum([self._sumw2[name] for name in self.order], axis=0)
+
+    def plot(self, ax, **kwargs):
+        """Draw the stack with sbnd_style.hist_stack; returns one artist per component."""
+        return sbnd_style.hist_stack(ax, self.counts, self.edges, labels=self.order,
+                                     colors=[self._style[name][0] for name in self.order],
+                                     hatches=[self._style[name][1] for name in self.order],
+                                     **kwargs)
@@ -0,0 +1,99 @@
+# sbnd_jobs.py
+#
+# Run independent plotting functions in parallel worker processes.
+# Each worker switches to the non-interactive Agg backend and applies the SBND
+# style once, when it starts, so individual jobs only pay for their own plots.
+#
+#     from sbnd_jobs import run_plot_jobs
+#     results = run_plot_jobs([make_plot_a, (make_plot_b, (data,))])
+
+import functools
+import os
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+JobResult = namedtuple('JobResult', ['name', 'wall_time', 'pid', 'error'])
+
+def _init_worker(backend):
+    """Per-process setup: pick the backend, apply the style and reseed NumPy."""
+    import matplotlib
+    matplotlib.use(backend)
+
+    import numpy as np
+    import sbnd_style
+    sbnd_style.set_sbnd_style()
+    # Forked workers inherit the parent's global RNG state; give each its own.
+    np.random.seed()
+
+def _run_job(func, args, kwargs):
+    """Run one job in a worker and time it."""
+    t0 = time.perf_counter()
+    error = None
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        error = traceback.format_exc()
+    return time.perf_counter() - t0, os.getpid(), error
+
+def _normalize_job(job):
+    """Accept `func`, `(func, args)` or `(func, args, kwargs)`."""
+    if callable(job):
+        return job, (), {}
+    func, args, *rest = job
+    return func, tuple(args), dict(rest[0]) if rest else {}
+
+def _job_name(func):
+    """Name shown in the report: functools.partial is unwrapped, else repr()."""
+    while isinstance(func, functools.partial):
+        func = func.func
+    return getattr(func, '__name__', repr(func))
+
+def run_plot_jobs(jobs, max_workers=None, backend='Agg', verbose=True):
+    """
+    Run plotting jobs across a process pool and report their timing.
+
+    Args:
+        jobs (list): Picklable callables, or (callable, args[, kwargs]) tuples.
+        max_workers (int): Number of worker processes (default: CPU count).
+        backend (str): Matplotlib backend used by the workers.
+        verbose (bool): Print the per-job and summary report.
+
+    Returns:
+        list of JobResult(name, wall_time, pid, error), in submission order.
+        `error` is the formatted traceback of a failed job, otherwise None.
+    """
+    jobs = [_normalize_job(job) for job in jobs]
+    results = [None] * len(jobs)
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(backend,)) as pool:
+        futures = {pool.submit(_run_job, *job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = JobResult(_job_name(jobs[i][0]), *future.result())
+    total_time = time.perf_counter() - t0
+
+    if verbose:
+        print_job_report(results, total_time)
+    return results
+
+def print_job_report(results, total_time):
+    """Print per-job wall times and a summary for the output of run_plot_jobs."""
+    width = max([len(r.name) for r in results] + [3])
+    print(f"{'job':<{width}} {'wall [s]':>9} {'pid':>8}  status")
+    for r in results:
+        status = 'ok' if r.error is None else 'FAILED'
+        print(f"{r.name:<{width}} {r.wall_time:9.3f} {r.pid:>8}  {status}")
+
+    busy_time = sum(r.wall_time for r in results)
+    n_failed = sum(r.error is not None for r in results)
+    n_workers = len({r.pid for r in results})
+    print(f"{len(results)} jobs ({n_failed} failed) on {n_workers} workers: "
+          f"{total_time:.3f} s wall, {busy_time:.3f} s in jobs, "
+          f"{busy_time / total_time if total_time else 0:.2f}x effective parallelism")
+    for r in results:
+        if r.error is not None:
+            print(f"--- {r.name} ---\n{r.error}")
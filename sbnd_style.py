@@ -1,15 +1,16 @@
 # sbnd_style_mpl.py
 #
-# This style will be automatically applied to any plots made after importing it.
-# If you don't want automatic styling, comment out the final line:
+# Importing this module is cheap: only the colour constants are defined up front.
+# Matplotlib (and pyplot) are imported the first time they are actually needed.
+# To apply the style, call it explicitly before making any plots:
 #
-#     set_sbnd_style()
+#     import sbnd_style
+#     sbnd_style.set_sbnd_style()
 #
 # heavily copied from DUNE official style by J. Wolcott and converted to Matplotlib
 
-import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
-from cycler import cycler
+from contextlib import contextmanager
+from functools import lru_cache
 
 # ----------------------------------------------------------------------------
 # Colo(u)r Definitions
@@ -50,25 +51,157 @@ SBND_COLOR_CYCLE = [
 # Custom Colormaps
 # ----------------------------------------------------------------------------
 
-def _register_cmap(name, colors, register=True):
-    """Create and optionally register a LinearSegmentedColormap."""
-    cmap = LinearSegmentedColormap.from_list(name, colors)
+# The colormaps are only built (and registered with Matplotlib) on first use,
+# either by accessing SEA_PALETTE / SYMMETRIC_PALETTE or by set_sbnd_style().
+# They are ListedColormaps over the same precomputed lookup tables that
+# apply_cmap uses, so images can be colorized identically without Matplotlib.
+# New palettes only need an entry in _PALETTE_COLORS.
+_PALETTE_COLORS = {
+    # Sea Palette: A monochrome palette (white -> blue)
+    'SEA_PALETTE': ('sbnd_sea', [
+        (1.0, 1.0, 1.0), # White
+        OKABE_ITO_BLUE   # SBND Blue
+    ]),
+    # Symmetric Palette: A bichrome palette (blue -> white -> vermilion)
+    'SYMMETRIC_PALETTE': ('sbnd_symmetric', [
+        OKABE_ITO_BLUE,      # Start
+        (1.0, 1.0, 1.0),     # Middle
+        OKABE_ITO_VERMILION  # End
+    ]),
+}
+_palettes = {}
+
+# Entries in each colormap lookup table.
+LUT_SIZE = 256
+
+# (LUT_SIZE, 4) float RGBA tables and their uint8 versions, keyed by colormap name.
+_luts = {}
+_luts_uint8 = {}
+
+def _palette_name(name):
+    """Colormap name for either a colormap name or a palette attribute name."""
+    if name in _PALETTE_COLORS:
+        return _PALETTE_COLORS[name][0]
+    for cmap_name, _ in _PALETTE_COLORS.values():
+        if name == cmap_name:
+            return name
+    raise ValueError(f"Unknown SBND palette {name!r}; expected one of "
+                     f"{[n for n, _ in _PALETTE_COLORS.values()]}")
+
+def palette_lut(name, bytes=False):
+    """
+    Precomputed RGBA lookup table of an SBND palette, without Matplotlib.
+
+    The colours are interpolated linearly between the evenly spaced palette
+    colours at LUT_SIZE points, with the arithmetic of Matplotlib's
+    LinearSegmentedColormap.from_list, so both the float and the uint8 tables
+    are identical to that colormap's.
+
+    Args:
+        name (str): Colormap name ('sbnd_sea') or attribute name ('SEA_PALETTE').
+        bytes (bool): Return uint8 values (0-255) instead of floats (0-1).
+
+    Returns:
+        (LUT_SIZE, 4) read-only array.
+    """
+    import numpy as np
+
+    name = _palette_name(name)
+    if name not in _luts:
+        colors = np.array(dict(_PALETTE_COLORS.values())[name], dtype=float)
+        # As matplotlib.colors._create_lookup_table (gamma = 1): bit-for-bit
+        # equality needs the same operations, not just the same interpolation.
+        x = np.linspace(0, 1, len(colors)) * (LUT_SIZE - 1)
+        xind = (LUT_SIZE - 1) * np.linspace(0, 1, LUT_SIZE)
+        ind = np.searchsorted(x, xind)[1:-1]
+        distance = (xind[1:-1] - x[ind - 1]) / (x[ind] - x[ind - 1])
+        lut = np.ones((LUT_SIZE, 4))
+        for channel in range(3):
+            y = colors[:, channel]
+            lut[:, channel] = np.clip(np.concatenate([
+                [y[0]], distance * (y[ind] - y[ind - 1]) + y[ind - 1], [y[-1]]]), 0, 1)
+        lut_uint8 = (lut * 255).astype(np.uint8)  # truncated, as Matplotlib does
+        lut.flags.writeable = lut_uint8.flags.writeable = False
+        _luts[name], _luts_uint8[name] = lut, lut_uint8
+    return _luts_uint8[name] if bytes else _luts[name]
+
+def apply_cmap(array, cmap='sbnd_sea', vmin=None, vmax=None, bytes=False):
+    """
+    Map an array straight to RGBA with a precomputed SBND lookup table.
+
+    uint8 arrays index the 256-entry table directly. Other arrays are scaled
+    linearly from [vmin, vmax] (default: the finite min and max) onto the
+    table and clipped at the ends; NaNs become transparent.
+
+    Args:
+        array (array): Values of any shape.
+        cmap (str): SBND colormap or palette attribute name.
+        vmin, vmax (float): Range mapped onto the colormap.
+        bytes (bool): Return uint8 RGBA instead of floats.
+
+    Returns:
+        Array of shape array.shape + (4,).
+    """
+    import numpy as np
+
+    lut = palette_lut(cmap, bytes)
+    array = np.asarray(array)
+    if array.dtype == np.uint8 and vmin is None and vmax is None and LUT_SIZE == 256:
+        return lut.take(array, axis=0)
+
+    if vmin is None or vmax is None:
+        finite = array[np.isfinite(array)] if array.dtype.kind == 'f' else array
+        lo, hi = (finite.min(), finite.max()) if finite.size else (0.0, 1.0)
+        vmin = lo if vmin is None else vmin
+        vmax = hi if vmax is None else vmax
+    scale = LUT_SIZE / (vmax - vmin) if vmax > vmin else 0.0
+    index = np.subtract(array, vmin, dtype=float)
+    index *= scale
+    bad = np.isnan(index)
+    has_bad = bad.any()
+    if has_bad:
+        index[bad] = 0
+    np.clip(index, 0, LUT_SIZE - 1, out=index)
+    rgba = lut.take(index.astype(np.intp), axis=0)
+    if has_bad:
+        rgba[bad] = 0
+    return rgba
+
+def _register_cmap(name, register=True):
+    """
+    Create a ListedColormap from the palette LUT and optionally register it.
+
+    Registration is idempotent: a colormap already registered under `name`
+    with the same colours (e.g. after importlib.reload or in a forked worker)
+    is left alone, and one with different colours is replaced.
+    """
+    import matplotlib
+    from matplotlib.colors import ListedColormap
+    cmap = ListedColormap(palette_lut(name), name=name)
     if register:
-        plt.register_cmap(name, cmap)
+        if name not in matplotlib.colormaps:
+            matplotlib.colormaps.register(cmap, name=name)
+        elif matplotlib.colormaps[name] != cmap:
+            import warnings
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', 'Overwriting the cmap')
+                matplotlib.colormaps.register(cmap, name=name, force=True)
     return cmap
 
-# Sea Palette: A monochrome palette (white -> blue)
-SEA_PALETTE = _register_cmap('sbnd_sea', [
-    (1.0, 1.0, 1.0), # White
-    OKABE_ITO_BLUE   # SBND Blue
-])
+def _register_palettes():
+    """Build and register the SBND colormaps once, returning them by attribute name."""
+    if not _palettes:
+        for attr, (name, _) in _PALETTE_COLORS.items():
+            _palettes[attr] = _register_cmap(name)
+    return _palettes
 
-# Symmetric Palette: A bichrome palette (blue -> white -> vermilion)
-SYMMETRIC_PALETTE = _register_cmap('sbnd_symmetric', [
-    OKABE_ITO_BLUE,      # Start
-    (1.0, 1.0, 1.0),     # Middle
-    OKABE_ITO_VERMILION  # End
-])
+def __getattr__(name):
+    """Lazily provide SEA_PALETTE, SYMMETRIC_PALETTE and the watermark classes."""
+    if name in _PALETTE_COLORS:
+        return _register_palettes()[name]
+    if name in ('WatermarkText', 'WatermarkGrid'):
+        return _watermark_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ----------------------------------------------------------------------------
 # Text Labels
@@ -78,21 +211,13 @@ def _sbnd_watermark_string():
     """Returns the 'SBND' part of the watermark as a list for styling."""
     return [('SBND', {'fontweight': 'bold'})]
 
-def text_label(ax, text_list, x=0.05, y=0.95, ha='left', va='top', **kwargs):
-    """
-    Apply a text label with mixed styling to a plot axis.
-
-    Args:
-        ax (matplotlib.axes.Axes): The axes to draw on.
-        text_list (list): A list of (substring, dict) tuples for mathtext.
-        x (float): x-location in axes coordinates (0-1).
-        y (float): y-location in axes coordinates (0-1).
-        ha (str): Horizontal alignment.
-        va (str): Vertical alignment.
-    """
+@lru_cache(maxsize=None)
+def _mathtext_string(frozen_text_list):
+    """Build the mathtext string for a text_list frozen into nested tuples."""
     # Use mathtext to render strings with different styles
     styled_text = ""
-    for s, props in text_list:
+    for s, props in frozen_text_list:
+        props = dict(props)
         weight = props.get('fontweight', 'normal')
         style = props.get('fontstyle', 'normal')
         
@@ -105,32 +230,1385 @@ def text_label(ax, text_list, x=0.05, y=0.95, ha='left', va='top', **kwargs):
 
         styled_text += s_cmd
     
-    final_text = f"${styled_text}$"
-    ax.text(x, y, final_text, ha=ha, va=va, transform=ax.transAxes, **kwargs)
+    return f"${styled_text}$"
 
+# Text images Agg drew for a label, keyed on text, font properties, dpi,
+# antialiasing and the label's pixel position and layout on the canvas.
+_RASTER_CACHE_SIZE = 128
+_raster_cache = {}
+
+def _font_key(prop):
+    """Hashable snapshot of a FontProperties (which is mutable)."""
+    return (tuple(prop.get_family()), prop.get_style(), prop.get_variant(),
+            prop.get_weight(), prop.get_stretch(), prop.get_size_in_points(),
+            prop.get_math_fontfamily())
+
+class _TextImageRecorder:
+    """
+    Stands in for RendererAgg._renderer while a label is drawn, recording the
+    draw_text_image calls (glyph coverage images and their pixel placement).
+
+    Any other call (e.g. the boxes of fraction bars) marks the label as not
+    replayable by setting `images` to None.
+    """
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.images = []
+
+    def draw_text_image(self, image, x, y, angle, gc):
+        if self.images is not None:
+            import numpy as np
+            self.images.append((np.array(image, copy=True), x, y, angle))
+        self.renderer.draw_text_image(image, x, y, angle, gc)
+
+    def __getattr__(self, name):
+        self.images = None
+        return getattr(self.renderer, name)
+
+_watermark_classes = {}
+
+def _watermark_class(name):
+    """Define (once) and return the Text subclasses used for watermarks."""
+    if not _watermark_classes:
+        from matplotlib.backends.backend_agg import RendererAgg
+        from matplotlib.colors import to_rgba
+        from matplotlib.text import Text
+
+        class WatermarkText(Text):
+            """
+            Text that replays cached glyph images of itself on Agg canvases.
+
+            Agg re-renders every mathtext glyph on each draw. The first draw
+            of a label goes through Text.draw while recording the images Agg
+            blits; identical labels (same text, font, dpi and pixel position)
+            replay them, so the output matches plain text pixel for pixel.
+            Other renderers (pdf, svg, ...) draw normal vector text, as do
+            layout passes (tight_layout, constrained layout, savefig's
+            bbox_inches), which draw with the draw_* methods disabled.
+            """
+            def draw(self, renderer):
+                if (not isinstance(renderer, RendererAgg) or not self.get_visible()
+                        or self.get_text() == '' or self.get_rotation() != 0
+                        or self.get_usetex() or self.get_path_effects()
+                        or self.get_bbox_patch() is not None
+                        # RendererBase._draw_disabled shadows draw_* on the instance.
+                        or 'draw_text' in vars(renderer)):
+                    return super().draw(renderer)
+                # The anchor in pixels and the layout relative to it fix where
+                # every line (and glyph) lands.
+                bbox = self._get_layout(renderer)[0]
+                x, y = self.get_transform().transform((self._x, self._y))
+                key = (self.get_text(), _font_key(self.get_fontproperties()), renderer.dpi,
+                       self._antialiased, renderer.height, x, y, tuple(bbox.bounds),
+                       self._multialignment, self._linespacing)
+                images = _raster_cache.get(key)
+                if images is None:
+                    recorder = _TextImageRecorder(renderer._renderer)
+                    renderer._renderer = recorder
+                    try:
+                        super().draw(renderer)
+                    finally:
+                        renderer._renderer = recorder.renderer
+                    # Nothing drawn (or not replayable): leave it uncached.
+                    if recorder.images:
+                        if len(_raster_cache) >= _RASTER_CACHE_SIZE:
+                            _raster_cache.clear()
+                        _raster_cache[key] = recorder.images
+                    return
+                # The graphics context Text.draw would use.
+                gc = renderer.new_gc()
+                gc.set_foreground(to_rgba(self.get_color()), isRGBA=True)
+                gc.set_alpha(self.get_alpha())
+                gc.set_antialiased(self._antialiased)
+                gc.set_snap(self.get_snap())
+                self._set_gc_clip(gc)
+                for image, x, y, angle in images:
+                    renderer._renderer.draw_text_image(image, x, y, angle, gc)
+                gc.restore()
+                self.stale = False
+
+        class WatermarkGrid(WatermarkText):
+            """
+            A single figure-level artist drawing the same label on many axes.
+
+            The label is positioned in pixels; at draw time it is moved to each
+            axes' (x, y) anchor in turn, reusing one layout and (if `cached`)
+            the cached images.
+            """
+            def __init__(self, axes, x, y, text, cached=True, **kwargs):
+                from matplotlib.transforms import IdentityTransform
+                super().__init__(0, 0, text, transform=IdentityTransform(), **kwargs)
+                self._label_axes = list(axes)
+                self._label_anchor = (x, y)
+                self._label_cached = cached
+
+            def draw(self, renderer):
+                if not self.get_visible():
+                    return
+                for ax in self._label_axes:
+                    if not ax.get_visible():
+                        continue
+                    # Set the position directly: set_position() would mark the
+                    # figure stale in the middle of its own draw.
+                    self._x, self._y = ax.transAxes.transform(self._label_anchor)
+                    if self._label_cached:
+                        super().draw(renderer)
+                    else:
+                        Text.draw(self, renderer)
+                self.stale = False
+
+        for cls in (WatermarkText, WatermarkGrid):
+            # Importable as sbnd_style.<name> (via __getattr__), so figures pickle.
+            cls.__qualname__ = cls.__name__
+            _watermark_classes[cls.__name__] = cls
+    return _watermark_classes[name]
+
+def text_label(ax, text_list, x=0.05, y=0.95, ha='left', va='top', cached=True, **kwargs):
+    """
+    Apply a text label with mixed styling to a plot axis.
+
+    Args:
+        ax (matplotlib.axes.Axes): The axes to draw on.
+        text_list (list): A list of (substring, dict) tuples for mathtext.
+        x (float): x-location in axes coordinates (0-1).
+        y (float): y-location in axes coordinates (0-1).
+        ha (str): Horizontal alignment.
+        va (str): Vertical alignment.
+        cached (bool): Replay the glyph images of an identical earlier label
+            when drawing with Agg (same pixels as plain ax.text).
+    """
+    final_text = _mathtext_string(_freeze_text_list(text_list))
+    if not cached:
+        return ax.text(x, y, final_text, ha=ha, va=va, transform=ax.transAxes, **kwargs)
+    # Mirror Axes.text, but with the caching Text subclass.
+    text = _watermark_class('WatermarkText')(x, y, final_text, ha=ha, va=va, clip_on=False,
+                                             transform=ax.transAxes, **kwargs)
+    ax.add_artist(text)
+    return text
+
+def _freeze_text_list(text_list):
+    """Turn a text_list into nested tuples usable as a cache key."""
+    return tuple((s, tuple(sorted(props.items()))) for s, props in text_list)
+
+def _watermark_label_list(kind):
+    """Returns the text_list for a watermark kind ('wip', 'preliminary' or 'official')."""
+    # FIX: Use mathtext spacing command '\;' to ensure spaces are rendered.
+    suffixes = {
+        'wip': [('\\;Work\\;in\\;Progress', {})],
+        'preliminary': [('\\;Preliminary', {})],
+        'official': [],
+    }
+    if kind not in suffixes:
+        raise ValueError(f"Unknown watermark kind {kind!r}; expected one of {list(suffixes)}")
+    return _sbnd_watermark_string() + suffixes[kind]
 
 def wip(ax, x=0.05, y=0.95, **kwargs):
     """Write a 'SBND Work in Progress' tag."""
-    # FIX: Use mathtext spacing command '\;' to ensure spaces are rendered.
-    label_list = _sbnd_watermark_string() + [('\\;Work\\;in\\;Progress', {})]
-    text_label(ax, label_list, x=x, y=y, **kwargs)
+    return text_label(ax, _watermark_label_list('wip'), x=x, y=y, **kwargs)
 
 def preliminary(ax, x=0.05, y=0.95, **kwargs):
     """Write a 'SBND Preliminary' tag."""
-    # FIX: Use mathtext spacing command '\;' to ensure spaces are rendered.
-    label_list = _sbnd_watermark_string() + [('\\;Preliminary', {})]
-    text_label(ax, label_list, x=x, y=y, **kwargs)
+    return text_label(ax, _watermark_label_list('preliminary'), x=x, y=y, **kwargs)
 
 def official(ax, x=0.05, y=0.95, **kwargs):
     """Write an 'SBND' tag (for officially approved results)."""
-    text_label(ax, _sbnd_watermark_string(), x=x, y=y, **kwargs)
+    return text_label(ax, _watermark_label_list('official'), x=x, y=y, **kwargs)
+
+def watermark(axes, kind='wip', x=0.05, y=0.95, ha='left', va='top', figure_level=False,
+              cached=True, **kwargs):
+    """
+    Write the same SBND tag on every axis of a (possibly nested) array of axes.
+
+    Args:
+        axes: A single Axes or any list/array of Axes, e.g. from plt.subplots.
+        kind (str): 'wip', 'preliminary' or 'official'.
+        x (float): x-location in axes coordinates (0-1).
+        y (float): y-location in axes coordinates (0-1).
+        ha (str): Horizontal alignment.
+        va (str): Vertical alignment.
+        figure_level (bool): Add one figure-level artist that draws the tag on all
+            axes instead of one Text per axis. All axes must share a figure.
+            Layouts (tight_layout, constrained) do not make room for it.
+        cached (bool): Replay cached glyph images when drawing with Agg (see
+            text_label).
+
+    Returns:
+        The figure-level artist, or a list with one artist per axis.
+    """
+    import numpy as np
+
+    axes_list = [ax for ax in np.asarray(axes, dtype=object).ravel() if ax is not None]
+    final_text = _mathtext_string(_freeze_text_list(_watermark_label_list(kind)))
+    if not figure_level:
+        if not cached:
+            return [ax.text(x, y, final_text, ha=ha, va=va, transform=ax.transAxes, **kwargs)
+                    for ax in axes_list]
+        text_cls = _watermark_class('WatermarkText')
+        artists = []
+        for ax in axes_list:
+            text = text_cls(x, y, final_text, ha=ha, va=va, clip_on=False,
+                            transform=ax.transAxes, **kwargs)
+            ax.add_artist(text)
+            artists.append(text)
+        return artists
+
+    figures = {ax.figure for ax in axes_list}
+    if len(figures) != 1:
+        raise ValueError("figure_level=True needs axes from exactly one figure")
+    text = _watermark_class('WatermarkGrid')(axes_list, x, y, final_text, cached=cached,
+                                             ha=ha, va=va, **kwargs)
+    figures.pop().add_artist(text)
+    return text
+
+# ----------------------------------------------------------------------------
+# Binned Histograms
+# ----------------------------------------------------------------------------
+
+def _stairs_style(color, hatch, fill, kwargs):
+    """Stairs colour arguments: hatched fills are drawn in the edge colour."""
+    if fill and hatch is not None:
+        kwargs.setdefault('facecolor', 'none')
+        kwargs.setdefault('edgecolor', color)
+    elif color is not None:
+        kwargs.setdefault('color', color)
+    return kwargs
+
+def hist_step(ax, counts, edges, color=None, hatch=None, fill=False, linewidth=2, **kwargs):
+    """
+    Draw already-binned contents as a step histogram (one StepPatch artist).
+
+    Args:
+        ax (matplotlib.axes.Axes): The axes to draw on.
+        counts (array): Bin contents.
+        edges (array): Bin edges (len(counts) + 1).
+        color: Line/fill colour, default from the SBND colour cycle.
+        hatch (str): Hatch pattern, e.g. '////'. With fill=True the area is
+            hatched in `color` instead of filled solid.
+        fill (bool): Fill the area under the histogram.
+        **kwargs: Passed to ax.stairs (label, baseline, ...).
+    """
+    kwargs = _stairs_style(color, hatch, fill, kwargs)
+    return ax.stairs(counts, edges, fill=fill, hatch=hatch, linewidth=linewidth, **kwargs)
+
+def hist_stack(ax, counts, edges, labels=None, colors=None, hatches=None, **kwargs):
+    """
+    Draw a stack of already-binned components, bottom first.
+
+    Args:
+        ax (matplotlib.axes.Axes): The axes to draw on.
+        counts (array): (components, bins) contents.
+        edges (array): Bin edges shared by all components.
+        labels, colors, hatches (list): Per component; colours default to the
+            SBND colour cycle.
+        **kwargs: Passed to every ax.stairs call.
+
+    Returns:
+        List of StepPatch artists, one per component.
+    """
+    import numpy as np
+
+    counts = np.asarray(counts, dtype=float)
+    n = len(counts)
+    cumulative = np.cumsum(counts, axis=0)
+    labels = [None] * n if labels is None else labels
+    colors = [None] * n if colors is None else colors
+    hatches = [None] * n if hatches is None else hatches
+    kwargs.setdefault('linewidth', 0)
+    artists = []
+    for i in range(n):
+        style = _stairs_style(colors[i], hatches[i], True, dict(kwargs))
+        artists.append(ax.stairs(cumulative[i], edges, baseline=cumulative[i - 1] if i else 0,
+                                 fill=True, hatch=hatches[i], label=labels[i], **style))
+    return artists
+
+# ----------------------------------------------------------------------------
+# Data/MC Ratio Plots
+# ----------------------------------------------------------------------------
+
+def _hist_arrays(hist):
+    """(counts, edges, variances) from an SBNDHist1D-like object or a tuple.
+
+    Tuples are (counts, edges) or (counts, edges, sumw2); the variances
+    default to the counts (unweighted Poisson).
+    """
+    import numpy as np
+
+    if hasattr(hist, 'variances'):
+        counts, edges, sumw2 = hist.counts, hist.edges, hist.variances
+    else:
+        counts, edges, *sumw2 = hist
+        sumw2 = sumw2[0] if sumw2 else counts
+    return (np.asarray(counts, dtype=float), np.asarray(edges, dtype=float),
+            np.asarray(sumw2, dtype=float))
+
+def ratio_values(data, mc, data_var, mc_var=None, kind='relative', out=None):
+    """
+    Data/MC ratio and its uncertainty, computed in place.
+
+    Args:
+        data, mc (array): Bin contents.
+        data_var, mc_var (array): Variances of data and MC (mc_var=None treats
+            the MC as exact, e.g. a fit).
+        kind (str): 'relative' for (data - mc) / mc, 'ratio' for data / mc.
+        out (tuple): Optional (ratio, error) float arrays to write into.
+
+    Returns:
+        (ratio, error); bins with mc == 0 are set to 0.
+    """
+    import numpy as np
+
+    if out is None:
+        out = (np.empty_like(mc, dtype=float), np.empty_like(mc, dtype=float))
+    ratio, error = out
+    valid = mc != 0
+
+    # error = sqrt(data_var + ratio² * mc_var) / mc, with ratio = data / mc
+    ratio.fill(0)
+    error.fill(0)
+    np.divide(data, mc, out=ratio, where=valid)
+    if mc_var is not None:
+        np.multiply(ratio, ratio, out=error)
+        error *= mc_var
+    error += data_var
+    np.sqrt(error, out=error)
+    np.divide(error, mc, out=error, where=valid)
+    error[~valid] = 0
+    if kind == 'relative':
+        np.subtract(ratio, 1, out=ratio, where=valid)
+    elif kind != 'ratio':
+        raise ValueError(f"Unknown ratio kind {kind!r}; expected 'relative' or 'ratio'")
+    return ratio, error
+
+def _errorbar_segments(x, y, yerr, out):
+    """Fill an (N, 2, 2) segment buffer with vertical error bars."""
+    out[:, :, 0] = x[:, None]
+    out[:, 0, 1] = y
+    out[:, 0, 1] -= yerr
+    out[:, 1, 1] = y
+    out[:, 1, 1] += yerr
+    return out
+
+class RatioPlot:
+    """
+    A reusable two-pad data/MC figure with a ratio pad below a shared x axis.
+
+    The figure, gridspec and axes are built once. The first call to plot()
+    creates the artists; later calls update them in place, reusing the
+    ratio and error-bar buffers, so one RatioPlot can render many histograms.
+
+    Args:
+        kind (str): 'relative' for (Data-MC)/MC or 'ratio' for Data/MC.
+        errors (str): Data uncertainties, 'poisson' (sqrt(N)) or 'sumw2'.
+        data_label, mc_label (str): Legend labels (also used in the ratio label).
+        height_ratios (tuple): Relative heights of the main and ratio pads.
+        figsize (tuple): Figure size, default from rcParams.
+        watermark (str): Optional tag for the main pad ('wip', 'preliminary',
+            'official').
+        ratio_ylim (tuple): y range of the ratio pad.
+        ratio_label (str): y label of the ratio pad, default from the labels.
+    """
+
+    def __init__(self, kind='relative', errors='poisson', data_label='Data', mc_label='MC',
+                 height_ratios=(3, 1), figsize=None, watermark=None, ratio_ylim=None,
+                 ratio_label=None):
+        import matplotlib.pyplot as plt
+
+        if errors not in ('poisson', 'sumw2'):
+            raise ValueError(f"Unknown errors {errors!r}; expected 'poisson' or 'sumw2'")
+        self.kind = kind
+        self.errors = errors
+        self.data_label = data_label
+        self.mc_label = mc_label
+        self.fig, (self.ax_main, self.ax_ratio) = plt.subplots(
+            2, 1, sharex=True, figsize=figsize,
+            gridspec_kw={'height_ratios': list(height_ratios)})
+        self.fig.subplots_adjust(hspace=0.1)
+        self.ax_ratio.axhline(0 if kind == 'relative' else 1,
+                              color=OKABE_ITO_VERMILION, linestyle='-')
+        if ratio_label is None:
+            ratio_label = (f"({data_label}-{mc_label})/{mc_label}" if kind == 'relative'
+                           else f"{data_label}/{mc_label}")
+        self.ax_ratio.set_ylabel(ratio_label)
+        self.ax_ratio.set_ylim(ratio_ylim or ((-1, 1) if kind == 'relative' else (0, 2)))
+        if watermark is not None:
+            text_label(self.ax_main, _watermark_label_list(watermark))
+        self._artists = None
+        self._buffers = None
+
+    def _ensure_buffers(self, n_bins):
+        import numpy as np
+
+        if self._buffers is None or len(self._buffers['ratio']) != n_bins:
+            self._buffers = {name: np.empty(n_bins) for name in
+                             ('centers', 'data_err', 'ratio', 'ratio_err')}
+            self._buffers['data_segments'] = np.empty((n_bins, 2, 2))
+            self._buffers['ratio_segments'] = np.empty((n_bins, 2, 2))
+        return self._buffers
+
+    def plot(self, data_hist, mc_hist):
+        """
+        Draw (or redraw) data and MC with their ratio.
+
+        Args:
+            data_hist: SBNDHist1D or (counts, edges[, sumw2]).
+            mc_hist: SBNDHist1D or (counts, edges[, sumw2]) drawn as a step
+                histogram, or a plain array of values at the data bin centres
+                (e.g. a fit) drawn as a line and treated as exact.
+        """
+        import numpy as np
+
+        data, edges, data_sumw2 = _hist_arrays(data_hist)
+        mc_is_curve = not (hasattr(mc_hist, 'counts') or isinstance(mc_hist, tuple))
+        if mc_is_curve:
+            mc, mc_sumw2 = np.asarray(mc_hist, dtype=float), None
+        else:
+            mc, _, mc_sumw2 = _hist_arrays(mc_hist)
+
+        buf = self._ensure_buffers(len(data))
+        centers = buf['centers']
+        np.add(edges[1:], edges[:-1], out=centers)
+        centers *= 0.5
+        data_var = data if self.errors == 'poisson' else data_sumw2
+        mc_var = None if mc_is_curve else (mc if self.errors == 'poisson' else mc_sumw2)
+        data_err = np.sqrt(data_var, out=buf['data_err'])
+        ratio, ratio_err = ratio_values(data, mc, data_var, mc_var, kind=self.kind,
+                                        out=(buf['ratio'], buf['ratio_err']))
+
+        if self._artists is None:
+            self._create_artists(centers, edges, data, data_err, mc, mc_is_curve, ratio, ratio_err)
+        else:
+            self._update_artists(centers, edges, data, data_err, mc, mc_is_curve, ratio, ratio_err)
+        for ax in (self.ax_main, self.ax_ratio):
+            ax.relim()
+            ax.autoscale_view(scaley=ax is self.ax_main)
+        return self
+
+    def _create_artists(self, centers, edges, data, data_err, mc, mc_is_curve, ratio, ratio_err):
+        if mc_is_curve:
+            mc_artist = self.ax_main.plot(centers, mc, color=OKABE_ITO_VERMILION,
+                                          label=self.mc_label)[0]
+        else:
+            mc_artist = self.ax_main.stairs(mc, edges, color=OKABE_ITO_VERMILION,
+                                            linewidth=2, label=self.mc_label)
+        data_bars = self.ax_main.errorbar(centers, data, yerr=data_err, fmt='o',
+                                          color='black', label=self.data_label)
+        ratio_bars = self.ax_ratio.errorbar(centers, ratio, yerr=ratio_err, fmt='o',
+                                            color='black')
+        self.ax_main.legend()
+        self._artists = {'mc': mc_artist, 'data': data_bars, 'ratio': ratio_bars,
+                         'mc_is_curve': mc_is_curve}
+
+    def _update_artists(self, centers, edges, data, data_err, mc, mc_is_curve, ratio, ratio_err):
+        if mc_is_curve != self._artists['mc_is_curve']:
+            raise ValueError("A RatioPlot template can't switch between MC curves and histograms")
+        if mc_is_curve:
+            self._artists['mc'].set_data(centers, mc)
+        else:
+            self._artists['mc'].set_data(mc, edges)
+        for name, y, yerr in (('data', data, data_err), ('ratio', ratio, ratio_err)):
+            line, _, (bars,) = self._artists[name]
+            line.set_data(centers, y)
+            bars.set_segments(_errorbar_segments(centers, y, yerr,
+                                                 self._buffers[f'{name}_segments']))
+
+def ratio_plot(data_hist, mc_hist, template=None, **kwargs):
+    """
+    Data/MC comparison with a ratio pad; see RatioPlot for the options.
+
+    Pass the RatioPlot returned by a previous call as `template` to redraw into
+    the same figure instead of building a new one.
+    """
+    if template is None:
+        template = RatioPlot(**kwargs)
+    elif kwargs:
+        raise TypeError("Options can't be changed when reusing a RatioPlot template")
+    return template.plot(data_hist, mc_hist)
+
+# ----------------------------------------------------------------------------
+# Figure Templates
+# ----------------------------------------------------------------------------
+
+class FigureTemplate:
+    """
+    A figure whose layout is built once and whose data is updated in place.
+
+    Axes, labels, legends and watermarks are set up once; data artists are
+    registered by name and refreshed with update(), which calls set_data /
+    set_array on the existing artists instead of re-creating the figure. Use
+    it for monitoring plots that are rendered many times with new contents.
+
+        tmpl = FigureTemplate(xlabel="x label", ylabel="y label", watermark='wip')
+        tmpl.add_stairs('mc', mc_counts, edges, label='MC')
+        tmpl.add_errorbar('data', centers, counts, yerr=np.sqrt(counts), label='Data')
+        tmpl.ax.legend()
+        for run in runs:
+            tmpl.update(mc=run.mc_counts, data=(run.counts, np.sqrt(run.counts)))
+            tmpl.savefig(f"run{run.number}.png")
+
+    Args:
+        nrows, ncols (int): Subplot grid, as for plt.subplots.
+        xlabel, ylabel (str): Axis labels for every axis.
+        watermark (str): Optional 'wip', 'preliminary' or 'official' tag.
+        **subplots_kw: Passed to plt.subplots (figsize, sharex, ...).
+    """
+
+    def __init__(self, nrows=1, ncols=1, xlabel=None, ylabel=None, watermark=None,
+                 **subplots_kw):
+        import matplotlib.pyplot as plt
+
+        self.fig, axes = plt.subplots(nrows, ncols, squeeze=False, **subplots_kw)
+        self.axes = axes.ravel()
+        for ax in self.axes:
+            if xlabel is not None:
+                ax.set_xlabel(xlabel)
+            if ylabel is not None:
+                ax.set_ylabel(ylabel)
+        if watermark is not None:
+            for ax in self.axes:
+                text_label(ax, _watermark_label_list(watermark))
+        self._updaters = {}
+
+    @property
+    def ax(self):
+        """The first (or only) axis."""
+        return self.axes[0]
+
+    def _register(self, name, ax, artist, updater):
+        if name in self._updaters:
+            raise ValueError(f"An artist named {name!r} is already registered")
+        self._updaters[name] = (ax, updater)
+        return artist
+
+    def add_stairs(self, name, values, edges, ax=None, **kwargs):
+        """Step histogram of binned values; update with new values."""
+        ax = self.ax if ax is None else ax
+        artist = ax.stairs(values, edges, **kwargs)
+        return self._register(name, ax, artist, lambda values: artist.set_data(values))
+
+    def add_line(self, name, x, y, ax=None, **kwargs):
+        """Line at fixed x; update with new y."""
+        ax = self.ax if ax is None else ax
+        artist = ax.plot(x, y, **kwargs)[0]
+        return self._register(name, ax, artist, artist.set_ydata)
+
+    def add_errorbar(self, name, x, y, yerr, ax=None, **kwargs):
+        """Points with vertical error bars at fixed x; update with (y, yerr)."""
+        import numpy as np
+
+        ax = self.ax if ax is None else ax
+        kwargs.setdefault('fmt', 'o')
+        kwargs.setdefault('color', 'black')
+        container = ax.errorbar(x, y, yerr=yerr, **kwargs)
+        line, _, (bars,) = container
+        x = np.asarray(x, dtype=float)
+        segments = np.empty((len(x), 2, 2))
+
+        def update(values):
+            y, yerr = (np.asarray(v, dtype=float) for v in values)
+            line.set_ydata(y)
+            bars.set_segments(_errorbar_segments(x, y, yerr, segments))
+        return self._register(name, ax, container, update)
+
+    def add_mesh(self, name, xedges, yedges, counts, ax=None, colorbar=None, **kwargs):
+        """2D histogram (indexed [x, y]) as pcolormesh; update with new counts.
+
+        The colour scale follows the new counts unless vmin/vmax are given.
+        `colorbar` is the colorbar label (None for no colorbar).
+        """
+        import numpy as np
+
+        ax = self.ax if ax is None else ax
+        kwargs.setdefault('cmap', _register_palettes()['SEA_PALETTE'])
+        kwargs.setdefault('rasterized', True)
+        fixed_scale = 'vmin' in kwargs or 'vmax' in kwargs or 'norm' in kwargs
+        mesh = ax.pcolormesh(xedges, yedges, np.asarray(counts).T, **kwargs)
+        if colorbar is not None:
+            self.fig.colorbar(mesh, ax=ax, label=colorbar)
+
+        def update(counts):
+            counts = np.asarray(counts).T
+            mesh.set_array(counts)
+            if not fixed_scale:
+                mesh.set_clim(counts.min(), counts.max())
+        return self._register(name, None, mesh, update)
+
+    def update(self, **data):
+        """Replace the contents of the named artists and rescale their axes."""
+        rescale = set()
+        for name, values in data.items():
+            ax, updater = self._updaters[name]
+            updater(values)
+            if ax is not None:
+                rescale.add(ax)
+        for ax in rescale:
+            ax.relim()
+            ax.autoscale_view()
+        return self
+
+    def savefig(self, path, **kwargs):
+        """Save the current state of the figure."""
+        self.fig.savefig(path, **kwargs)
+
+    def close(self):
+        """Release the figure."""
+        import matplotlib.pyplot as plt
+        plt.close(self.fig)
+
+# ----------------------------------------------------------------------------
+# Layout Presets
+# ----------------------------------------------------------------------------
+
+# Fixed figure margins in inches (so they hold for any figsize), solved with
+# tight_layout for the style's font sizes and typical label lengths.
+LAYOUT_PRESETS = {
+    # One axes with x/y labels
+    'single': {'left': 1.0, 'right': 0.25, 'bottom': 0.75, 'top': 0.25},
+    # Data/MC main pad over a ratio pad sharing the x axis
+    'ratio': {'left': 1.0, 'right': 0.25, 'bottom': 0.75, 'top': 0.3, 'hspace': 0.1},
+    # One axes with a labelled colorbar on its right
+    'colorbar': {'left': 0.9, 'right': 0.25, 'bottom': 0.75, 'top': 0.25},
+}
+
+# Solved subplots_adjust geometries keyed by (preset, figsize, font size, labels).
+_layout_cache = {}
+
+def _preset_geometry(preset, width, height):
+    """subplots_adjust arguments (figure fractions) of a preset for a figure size."""
+    margins = LAYOUT_PRESETS[preset]
+    geometry = {
+        'left': margins['left'] / width,
+        'right': 1 - margins['right'] / width,
+        'bottom': margins['bottom'] / height,
+        'top': 1 - margins['top'] / height,
+    }
+    for key in ('wspace', 'hspace'):
+        if key in margins:
+            geometry[key] = margins[key]
+    return geometry
+
+def _label_signature(fig):
+    """Lengths of the labels, titles and tick labels that set the margins."""
+    signature = []
+    for ax in fig.axes:
+        ticks = []
+        for axis in (ax.xaxis, ax.yaxis):
+            labels = axis.get_major_formatter().format_ticks(axis.get_majorticklocs())
+            ticks.append(max(map(len, labels), default=0))
+        signature.append((len(ax.get_xlabel()), len(ax.get_ylabel()), len(ax.get_title()),
+                          *ticks))
+    return tuple(signature)
+
+def apply_layout(fig, preset='single', solve=True):
+    """
+    Lay out a figure with a cached geometry instead of tight_layout on every figure.
+
+    With solve=True the first figure with a given preset, figsize, font size
+    and label/tick-label lengths is laid out by tight_layout, and the result
+    is cached; later figures of the same shape only call subplots_adjust.
+    With solve=False the fixed LAYOUT_PRESETS margins are used directly and
+    nothing is measured.
+
+    Args:
+        fig (matplotlib.figure.Figure): The figure.
+        preset (str): 'single', 'ratio' or 'colorbar'.
+        solve (bool): Solve and cache per label signature, or use the preset.
+
+    Returns:
+        dict of the subplots_adjust arguments applied.
+    """
+    import matplotlib
+
+    if preset not in LAYOUT_PRESETS:
+        raise ValueError(f"Unknown layout preset {preset!r}; expected one of {list(LAYOUT_PRESETS)}")
+    width, height = fig.get_size_inches()
+    if not solve:
+        geometry = _preset_geometry(preset, width, height)
+    else:
+        key = (preset, round(width, 3), round(height, 3), matplotlib.rcParams['font.size'],
+               _label_signature(fig))
+        geometry = _layout_cache.get(key)
+        if geometry is None:
+            fig.tight_layout()
+            params = fig.subplotpars
+            geometry = {name: getattr(params, name)
+                        for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')}
+            # Spacing that is part of the preset (the joined ratio pads) wins.
+            geometry.update({k: v for k, v in LAYOUT_PRESETS[preset].items()
+                             if k in ('wspace', 'hspace')})
+            _layout_cache[key] = geometry
+    fig.subplots_adjust(**geometry)
+    return geometry
+
+# ----------------------------------------------------------------------------
+# Saving Figures
+# ----------------------------------------------------------------------------
+
+# Background PNG encoder threads, created on first use.
+SAVE_WORKERS = 2
+_save_pool = None
+# Pending encodes keyed by canvas: a canvas is not redrawn while its buffer is
+# still being encoded.
+_pending_saves = {}
+
+def _encode_png(buffer, size, path, compress_level, dpi, metadata):
+    """Write an RGBA buffer to a PNG file with Pillow."""
+    from PIL import Image, PngImagePlugin
+
+    image = Image.frombuffer('RGBA', size, buffer, 'raw', 'RGBA', 0, 1)
+    info = PngImagePlugin.PngInfo()
+    for key, value in metadata.items():
+        info.add_text(key, value)
+    image.save(path, format='png', compress_level=compress_level, dpi=(dpi, dpi),
+               pnginfo=info)
+    return path
+
+def _savefig_dpi(fig, dpi):
+    """Resolve a save dpi as savefig does: None means rcParams, 'figure' fig.dpi."""
+    import matplotlib
+
+    if dpi is None:
+        dpi = matplotlib.rcParams['savefig.dpi']
+    if dpi == 'figure':
+        dpi = fig.dpi
+    return dpi
+
+def _png_metadata():
+    """The Software text chunk savefig writes into PNGs."""
+    import matplotlib
+    return {'Software': f"Matplotlib version{matplotlib.__version__}, https://matplotlib.org/"}
+
+def _get_save_pool():
+    """The background encoder pool, created on first use."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    global _save_pool
+    if _save_pool is None:
+        _save_pool = ThreadPoolExecutor(max_workers=SAVE_WORKERS, thread_name_prefix='sbnd_save')
+    return _save_pool
+
+def _agg_canvas(fig):
+    """
+    The Agg canvas to render `fig` on, once its pending encode (if any) is done.
+
+    A failed encode is not raised here: it is reported by its own future, and
+    stays in _pending_saves (no longer keyed by the canvas) for wait_saves.
+    """
+    from concurrent.futures import wait
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    canvas = fig.canvas
+    if not isinstance(canvas, FigureCanvasAgg):
+        # A separate Agg canvas (e.g. for Cairo backends); the figure keeps its own.
+        original = canvas
+        canvas = FigureCanvasAgg(fig)
+        fig.set_canvas(original)
+    pending = _pending_saves.get(canvas)
+    if pending is not None:
+        wait([pending])
+        if _pending_saves.get(canvas) is pending:
+            _pending_saves[pending] = _pending_saves.pop(canvas)
+    return canvas
+
+def _render_agg(fig, dpi, canvas=None):
+    """Draw `fig` with Agg at `dpi`; returns (canvas, RGBA memoryview, (width, height))."""
+    if canvas is None:
+        canvas = _agg_canvas(fig)
+    original_dpi = fig.dpi
+    fig.dpi = dpi
+    try:
+        canvas.draw()
+    finally:
+        fig.dpi = original_dpi
+    buffer = canvas.buffer_rgba()
+    return canvas, buffer, (buffer.shape[1], buffer.shape[0])
+
+def save(fig, path, dpi=None, compress_level=6, background=True, close=False, **kwargs):
+    """
+    Save a figure, encoding PNGs from the Agg buffer in a background thread.
+
+    For PNG paths the figure is drawn once with Agg and the canvas's RGBA
+    buffer is handed to Pillow without a copy; with background=True the
+    encoding runs in a thread pool, so the next figure can be rendered
+    meanwhile. Other formats go through fig.savefig.
+
+    The canvas is not redrawn by a later save() until its encode finished,
+    but do not draw the figure in other ways (or modify it and call
+    fig.canvas.draw) before the returned future is done. Layout must be
+    fixed beforehand (e.g. apply_layout); savefig options such as
+    bbox_inches, transparent or facecolor are not supported for PNGs.
+
+    Args:
+        fig (matplotlib.figure.Figure): The figure.
+        path (str): Output file; the extension selects the format.
+        dpi (float): Resolution, default rcParams['savefig.dpi'].
+        compress_level (int): zlib level 0-9 for PNG: 1 is several times
+            faster than the default 6 and gives somewhat larger files.
+        background (bool): Encode PNGs in the background thread pool.
+        close (bool): Close the figure once it is drawn.
+        **kwargs: Passed to fig.savefig for non-PNG formats; a TypeError
+            for PNG paths.
+
+    Returns:
+        concurrent.futures.Future resolving to `path` (already done unless a
+        PNG is encoded in the background); see also wait_saves.
+    """
+    import os
+    from concurrent.futures import Future
+
+    import matplotlib.pyplot as plt
+
+    dpi = _savefig_dpi(fig, dpi)
+
+    if os.path.splitext(os.fspath(path))[1].lower() != '.png':
+        fig.savefig(path, dpi=dpi, **kwargs)
+        if close:
+            plt.close(fig)
+        future = Future()
+        future.set_result(path)
+        return future
+
+    if kwargs:
+        raise TypeError(f"save() does not support {', '.join(sorted(kwargs))} for PNG "
+                        "output; use fig.savefig")
+    canvas, buffer, size = _render_agg(fig, dpi)
+    if close:
+        plt.close(fig)
+    args = (buffer, size, path, compress_level, dpi, _png_metadata())
+    if not background:
+        future = Future()
+        future.set_result(_encode_png(*args))
+        return future
+
+    future = _get_save_pool().submit(_encode_png, *args)
+    _pending_saves[canvas] = future
+    # Finished encodes are forgotten; failed ones are kept for wait_saves.
+    future.add_done_callback(lambda f: _pending_saves.pop(canvas, None)
+                             if _pending_saves.get(canvas) is f and f.exception() is None
+                             else None)
+    return future
+
+def wait_saves():
+    """Block until every background save() has been written; re-raises errors."""
+    while _pending_saves:
+        _, future = _pending_saves.popitem()
+        future.result()
+
+# Raster formats export() encodes from the Agg buffer; everything else is
+# rendered by Matplotlib's vector backends.
+RASTER_FORMATS = ('png', 'jpg', 'jpeg', 'tif', 'tiff', 'webp')
+# Worker processes writing vector formats in export(vector_workers='process').
+# With threads, one thread per figure in flight.
+VECTOR_WORKERS = 2
+_vector_pools = {}
+
+def _encode_raster(buffer, size, path, fmt, compress_level, dpi, metadata, facecolor):
+    """Write an RGBA buffer in one of RASTER_FORMATS with Pillow."""
+    from PIL import Image
+
+    if fmt == 'png':
+        return _encode_png(buffer, size, path, compress_level, dpi, metadata)
+    image = Image.frombuffer('RGBA', size, buffer, 'raw', 'RGBA', 0, 1)
+    if fmt in ('jpg', 'jpeg'):
+        # No alpha in JPEG: composite onto the figure background, as savefig does.
+        background = Image.new('RGB', size, facecolor)
+        background.paste(image, mask=image)
+        image, fmt = background, 'jpeg'
+    image.save(path, format={'tif': 'tiff'}.get(fmt, fmt), dpi=(dpi, dpi))
+    return path
+
+def _init_export_worker():
+    """Per-process setup of the export process pool."""
+    import matplotlib
+    matplotlib.use('Agg')
+    set_sbnd_style()
+
+def _write_vector(data, path, dpi, rc, raster_threshold):
+    """In an export worker process: apply the caller's rcParams, unpickle and save."""
+    import pickle
+
+    _apply_rcparams(rc)
+    _set_raster_threshold(raster_threshold)
+    pickle.loads(data).savefig(path, dpi=dpi)
+    return path
+
+def _vector_pool(kind):
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if kind not in _vector_pools:
+        if kind == 'thread':
+            _vector_pools[kind] = ThreadPoolExecutor(max_workers=VECTOR_WORKERS,
+                                                     thread_name_prefix='sbnd_export')
+        else:
+            _vector_pools[kind] = ProcessPoolExecutor(max_workers=VECTOR_WORKERS,
+                                                      initializer=_init_export_worker)
+    return _vector_pools[kind]
+
+def _snapshot(fig):
+    """Pickle `fig` without tying the copy to pyplot (unpickling must not open a window)."""
+    import pickle
+
+    manager = fig.canvas.manager
+    fig.canvas.manager = None
+    try:
+        return pickle.dumps(fig)
+    finally:
+        fig.canvas.manager = manager
+
+def export(fig, basename, formats=('png', 'pdf'), dpi=None, compress_level=6,
+           vector_workers='thread', wait=True, close=False):
+    """
+    Write a figure in several formats from a single Agg render.
+
+    All raster formats (PNG, JPEG, TIFF, WebP) are encoded from the same
+    Agg buffer in the save() thread pool. Vector formats (PDF, SVG, EPS, ...)
+    need their own render; they are written in the background while the
+    caller goes on (e.g. to the next figure): by a worker thread drawing the
+    figure itself, or by worker processes drawing pickled copies.
+
+    As for save(), do not modify or draw the figure until the manifest is
+    ready (wait=False); closing it is fine. With processes the figure may be
+    changed right away.
+
+    Args:
+        fig (matplotlib.figure.Figure): The figure.
+        basename (str): Output path without extension; `basename.<format>`
+            is written for every format.
+        formats (sequence): File extensions.
+        dpi (float): Resolution, default rcParams['savefig.dpi'].
+        compress_level (int): zlib level 0-9 for PNG (see save).
+        vector_workers (str): 'thread' (one thread writes the vector formats
+            of a figure in turn) or 'process' (each format in one of
+            VECTOR_WORKERS processes). Processes avoid GIL contention but
+            pay for pickling the figure and the current rcParams.
+        wait (bool): Return the manifest, or a Future resolving to it.
+        close (bool): Close the figure once it is drawn.
+
+    Returns:
+        Manifest: list of {'path', 'format', 'bytes', 'seconds'} in the order
+        of `formats`, where seconds is the time from the call until the file
+        was written. With wait=False, a Future of the manifest.
+    """
+    import os
+    import threading
+    import time
+    from concurrent.futures import Future
+
+    import matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import to_rgb
+
+    if vector_workers not in ('thread', 'process'):
+        raise ValueError(f"Unknown vector_workers {vector_workers!r}; expected 'thread' or 'process'")
+    formats = [fmt.lower().lstrip('.') for fmt in formats]
+    if not formats:
+        raise ValueError("export needs at least one format")
+    dpi = _savefig_dpi(fig, dpi)
+    t0 = time.perf_counter()
+    jobs = {}
+    finished = {}
+    manifest = Future()
+    lock = threading.Lock()
+
+    raster = [fmt for fmt in formats if fmt in RASTER_FORMATS]
+    vector = [fmt for fmt in formats if fmt not in RASTER_FORMATS]
+    # Registered before any job runs, so wait_saves() sees every export; the
+    # canvas is not redrawn by save()/export() until its buffer is encoded.
+    canvas = _agg_canvas(fig) if raster else None
+    key = canvas if raster else manifest
+    _pending_saves[key] = manifest
+
+    def forget():
+        if _pending_saves.get(key) is manifest:
+            _pending_saves.pop(key, None)
+
+    def done(fmt, future):
+        with lock:
+            finished[fmt] = time.perf_counter() - t0
+            complete = len(finished) == len(jobs)
+        if not complete:
+            return
+        try:
+            for future in jobs.values():
+                future.result()
+            manifest.set_result([{'path': f"{basename}.{f}", 'format': f,
+                                  'bytes': os.path.getsize(f"{basename}.{f}"),
+                                  'seconds': finished[f]} for f in formats])
+        except Exception as error:
+            manifest.set_exception(error)
+        # Failed exports are kept for wait_saves() unless the caller waits.
+        if manifest.exception() is None:
+            forget()
+
+    try:
+        if vector and vector_workers == 'process':
+            # Snapshot before anything else draws; each process renders its own copy.
+            data = _snapshot(fig)
+            rc = {k: v for k, v in matplotlib.rcParams.items()
+                  if k not in ('backend', 'backend_fallback', 'interactive')}
+            for fmt in vector:
+                jobs[fmt] = _vector_pool('process').submit(
+                    _write_vector, data, f"{basename}.{fmt}", dpi, rc, _raster_threshold)
+
+        if raster:
+            canvas, buffer, size = _render_agg(fig, dpi, canvas)
+            metadata = _png_metadata()
+            facecolor = tuple(int(255 * c) for c in to_rgb(fig.get_facecolor()))
+            for fmt in raster:
+                jobs[fmt] = _get_save_pool().submit(_encode_raster, buffer, size,
+                                                    f"{basename}.{fmt}", fmt, compress_level,
+                                                    dpi, metadata, facecolor)
+        if vector and vector_workers == 'thread':
+            # One thread draws the figure itself for each vector format in turn,
+            # after the Agg render: a figure must not be drawn by two threads at once.
+            def write_vectors():
+                for fmt in vector:
+                    fig.savefig(f"{basename}.{fmt}", dpi=dpi)
+            writer = _vector_pool('thread').submit(write_vectors)
+            for fmt in vector:
+                jobs[fmt] = writer
+    except BaseException:
+        forget()
+        raise
+    if close:
+        plt.close(fig)
+
+    for fmt, future in jobs.items():
+        future.add_done_callback(lambda f, fmt=fmt: done(fmt, f))
+    if not wait:
+        return manifest
+    try:
+        return manifest.result()
+    finally:
+        forget()
+
+# ----------------------------------------------------------------------------
+# Rasterization Policy
+# ----------------------------------------------------------------------------
+
+# Artists with more points/vertices than this are rasterized in vector output
+# (PDF, SVG, PS). None disables the policy; set with set_sbnd_style().
+_raster_threshold = None
+_figure_draw = None
+
+def _artist_size(artist):
+    """Number of points or vertices an artist would write to a vector file."""
+    from matplotlib.collections import Collection, QuadMesh
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+
+    if isinstance(artist, Line2D):
+        return len(artist.get_xydata())
+    if isinstance(artist, QuadMesh):
+        return artist.get_coordinates()[..., 0].size
+    if isinstance(artist, Collection):
+        n_offsets = len(artist.get_offsets())
+        if n_offsets > 1:
+            return n_offsets
+        return sum(len(path.vertices) for path in artist.get_paths())
+    if isinstance(artist, Patch):
+        return len(artist.get_path().vertices)
+    return 0
+
+def heavy_artists(fig, threshold):
+    """
+    Data artists of `fig` with more than `threshold` points or vertices.
+
+    Only lines, collections and patches inside axes are considered: text,
+    axis lines, ticks, spines, legends and images are never returned.
+    """
+    from matplotlib.spines import Spine
+
+    heavy = []
+    for ax in fig.axes:
+        for artist in ax.get_children():
+            if (artist is ax.patch or isinstance(artist, Spine)
+                    or artist.get_rasterized()):
+                continue
+            if _artist_size(artist) > threshold:
+                heavy.append(artist)
+    return heavy
+
+def _install_raster_policy():
+    """Wrap Figure.draw once so vector output applies _raster_threshold.
+
+    A wrapper left by an earlier copy of this module (importlib.reload) is
+    replaced rather than wrapped again.
+    """
+    global _figure_draw
+    if _figure_draw is not None:
+        return
+    from matplotlib.backends.backend_agg import RendererAgg
+    from matplotlib.figure import Figure
+
+    _figure_draw = getattr(Figure.draw, '_sbnd_original', Figure.draw)
+
+    def draw(self, renderer):
+        if _raster_threshold is None or isinstance(renderer, RendererAgg):
+            return _figure_draw(self, renderer)
+        # Rasterize only for this draw, leaving the artists untouched.
+        heavy = heavy_artists(self, _raster_threshold)
+        for artist in heavy:
+            artist.set_rasterized(True)
+        try:
+            return _figure_draw(self, renderer)
+        finally:
+            for artist in heavy:
+                artist.set_rasterized(False)
+
+    draw._sbnd_original = _figure_draw
+    Figure.draw = draw
+
+def _set_raster_threshold(threshold):
+    global _raster_threshold
+    if threshold is not None:
+        _install_raster_policy()
+    _raster_threshold = threshold
+
+# ----------------------------------------------------------------------------
+# Profiling
+# ----------------------------------------------------------------------------
+
+# Stages timed by profile(), in report order.
+PROFILE_STAGES = ('binning', 'artists', 'layout', 'mathtext', 'draw', 'encode', 'savefig')
+
+# (module path, attribute, stage) of the functions profile() wraps. Modules
+# that are not imported when profiling starts are skipped.
+_PROFILE_HOOKS = [
+    ('numpy', 'histogram', 'binning'),
+    ('numpy', 'histogram2d', 'binning'),
+    ('numpy', 'histogramdd', 'binning'),
+    ('sbnd_hist', 'histogram_fill', 'binning'),
+    ('sbnd_hist', 'credible_levels', 'binning'),
+    *[('matplotlib.axes.Axes', name, 'artists') for name in (
+        'plot', 'errorbar', 'scatter', 'step', 'stairs', 'hist', 'bar', 'fill_between',
+        'pcolormesh', 'imshow', 'contour', 'contourf', 'text', 'legend', 'add_artist')],
+    ('matplotlib.figure.Figure', 'subplots', 'artists'),
+    ('matplotlib.figure.Figure', 'add_subplot', 'artists'),
+    ('matplotlib.figure.Figure', 'colorbar', 'artists'),
+    ('matplotlib.figure.Figure', 'tight_layout', 'layout'),
+    ('matplotlib.figure.Figure', 'subplots_adjust', 'layout'),
+    ('matplotlib.mathtext.MathTextParser', 'parse', 'mathtext'),
+    ('matplotlib.figure.Figure', 'draw', 'draw'),
+    ('matplotlib.image', 'imsave', 'encode'),
+    ('sbnd_style', '_encode_png', 'encode'),
+    ('sbnd_style', '_encode_raster', 'encode'),
+    ('matplotlib.figure.Figure', 'savefig', 'savefig'),
+    ('sbnd_style', 'save', 'savefig'),
+]
+
+def _resolve_hook(path):
+    """The module or class named by a dotted path, or None if not imported."""
+    import importlib
+    import sys
+
+    module_path, _, class_name = path.rpartition('.')
+    if path in sys.modules:
+        return sys.modules[path]
+    if module_path in sys.modules or (module_path and module_path.split('.')[0] == 'matplotlib'):
+        return getattr(importlib.import_module(module_path), class_name, None)
+    return None
+
+class FigureProfile:
+    """
+    Per-figure stage timings collected by profile().
+
+    Time is exclusive: a stage called from inside another (np.histogram in
+    ax.hist, mathtext parsing inside a draw) is only counted for the inner
+    stage. Timings are grouped into one record per saved figure, labelled
+    by the savefig file name; work done before a figure is saved (binning
+    its data, creating its artists) counts towards that figure. PNG encodes
+    running in the background (save) count towards the figure being
+    produced when they finish.
+    """
+
+    def __init__(self):
+        import threading
+        self.records = []
+        self.wall_time = 0.0
+        self._pending = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._patched = []
+
+    def _wrap(self, func, stage):
+        import functools
+        import time
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            stack = self._local.__dict__.setdefault('stack', [])
+            stack.append(0.0)
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - t0
+                inner = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self._add(stage, elapsed - inner)
+                if stage == 'savefig' and not stack:
+                    self._finish_figure(args[1] if len(args) > 1 else kwargs.get('fname'))
+        return timed
+
+    def _add(self, stage, seconds):
+        with self._lock:
+            calls, total = self._pending.get(stage, (0, 0.0))
+            self._pending[stage] = (calls + 1, total + seconds)
+
+    def _finish_figure(self, fname):
+        import os
+        try:
+            label = os.path.basename(os.fspath(fname))
+        except TypeError:
+            label = f"figure {len(self.records) + 1}"
+        with self._lock:
+            self.records.append({'figure': label, 'stages': self._pending})
+            self._pending = {}
+
+    def start(self):
+        import time
+        for path, attr, stage in _PROFILE_HOOKS:
+            owner = _resolve_hook(path)
+            if owner is None or not hasattr(owner, attr):
+                continue
+            own = vars(owner).get(attr)
+            wrapper = self._wrap(getattr(owner, attr), stage)
+            self._patched.append((owner, attr, own, wrapper))
+            setattr(owner, attr, wrapper)
+        self._t0 = time.perf_counter()
+
+    def stop(self):
+        global _figure_draw
+        import time
+        self.wall_time = time.perf_counter() - self._t0
+        for owner, attr, own, wrapper in reversed(self._patched):
+            current = vars(owner).get(attr)
+            if current is wrapper:
+                if own is None:
+                    delattr(owner, attr)
+                else:
+                    setattr(owner, attr, own)
+            elif getattr(current, '_sbnd_original', None) is wrapper:
+                # The raster policy was installed on top of the timing wrapper
+                # while profiling: keep the policy, unhook the wrapper below it.
+                _figure_draw = current._sbnd_original = wrapper.__wrapped__
+            # Anything else replaced the attribute meanwhile and is left alone.
+        self._patched = []
+        if self._pending:
+            self.records.append({'figure': '(not saved)', 'stages': self._pending})
+            self._pending = {}
+
+    def summary(self):
+        """Per stage: calls, total seconds, mean and max seconds per figure."""
+        summary = {}
+        for stage in PROFILE_STAGES:
+            per_figure = [r['stages'][stage][1] for r in self.records if stage in r['stages']]
+            if per_figure:
+                summary[stage] = {
+                    'calls': sum(r['stages'][stage][0] for r in self.records
+                                 if stage in r['stages']),
+                    'total': sum(per_figure),
+                    'mean': sum(per_figure) / len(self.records),
+                    'max': max(per_figure),
+                }
+        return summary
+
+    def to_dict(self):
+        return {
+            'wall_time': self.wall_time,
+            'figures': [{'figure': r['figure'],
+                         'total': sum(t for _, t in r['stages'].values()),
+                         'stages': {s: {'calls': c, 'seconds': t}
+                                    for s, (c, t) in r['stages'].items()}}
+                        for r in self.records],
+            'stages': self.summary(),
+        }
+
+    def save(self, path):
+        """Write the report as JSON, or as CSV if `path` ends in .csv."""
+        import csv
+        import json
+
+        if not str(path).endswith('.csv'):
+            with open(path, 'w') as f:
+                json.dump(self.to_dict(), f, indent=1)
+            return
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['figure', 'stage', 'calls', 'seconds'])
+            for r in self.records:
+                for stage in PROFILE_STAGES:
+                    if stage in r['stages']:
+                        writer.writerow([r['figure'], stage, *r['stages'][stage]])
+            for stage, agg in self.summary().items():
+                writer.writerow(['ALL', stage, agg['calls'], agg['total']])
+
+    def print_report(self):
+        """Print per-figure stage times [ms] and the aggregates."""
+        stages = [s for s in PROFILE_STAGES if any(s in r['stages'] for r in self.records)]
+        width = max([len(r['figure']) for r in self.records] + [6])
+        print(f"{'figure':<{width}} " + ' '.join(f"{s:>9}" for s in stages) + f" {'total':>9}")
+        for r in self.records:
+            times = [r['stages'].get(s, (0, 0.0))[1] for s in stages]
+            print(f"{r['figure']:<{width}} " + ' '.join(f"{1e3 * t:9.1f}" for t in times)
+                  + f" {1e3 * sum(times):9.1f}")
+        summary = self.summary()
+        for name in ('total', 'mean', 'max'):
+            times = [summary[s][name] for s in stages]
+            print(f"{name:<{width}} " + ' '.join(f"{1e3 * t:9.1f}" for t in times)
+                  + (f" {1e3 * sum(times):9.1f}" if name != 'max' else ''))
+        print(f"{len(self.records)} figures, {self.wall_time:.3f} s wall")
+
+_active_profile = None
+
+@contextmanager
+def profile(report=None, verbose=False):
+    """
+    Time the stages of figure production while active (opt-in).
+
+    Wraps the histogramming, artist-creation, layout, mathtext, draw, image
+    encoding and savefig entry points, and groups their time per saved
+    figure. Works as a context manager or decorator:
+
+        with sbnd_style.profile(report='profile.json') as prof:
+            make_plots()
+        prof.print_report()
+
+        @sbnd_style.profile(report='profile.csv', verbose=True)
+        def make_plots(): ...
+
+    Args:
+        report (str): Write the report here on exit (.json, or .csv).
+        verbose (bool): Print the report on exit.
+
+    Yields:
+        FigureProfile with the records and the summary().
+    """
+    global _active_profile
+    if _active_profile is not None:
+        raise RuntimeError("profile() is already active")
+    prof = _active_profile = FigureProfile()
+    prof.start()
+    try:
+        yield prof
+    finally:
+        prof.stop()
+        _active_profile = None
+        if report is not None:
+            prof.save(report)
+        if verbose:
+            prof.print_report()
 
 # ----------------------------------------------------------------------------
 # Main Style Setter
 # ----------------------------------------------------------------------------
-def set_sbnd_style():
-    """Enable the SBND style for Matplotlib."""
-    style_dict = {
+def _sbnd_style_dict():
+    """Returns the SBND rcParams as a plain (unvalidated) dict."""
+    from cycler import cycler
+
+    return {
         # Figure
         "figure.facecolor": "white",
         "figure.figsize": (8, 6),
@@ -181,8 +1659,65 @@ def set_sbnd_style():
         # Default Colormap
         "image.cmap": 'cividis'
     }
-    plt.style.use(style_dict)
 
-# --- Automatically apply the style upon import ---
-# Comment out the line below if you want to apply the style manually.
-set_sbnd_style()
\ No newline at end of file
+_rcparams = None
+
+def _sbnd_rcparams():
+    """Returns the SBND style as a matplotlib.RcParams, validated only once."""
+    global _rcparams
+    if _rcparams is None:
+        import matplotlib
+        _rcparams = matplotlib.RcParams(_sbnd_style_dict())
+    return _rcparams
+
+def _apply_rcparams(params):
+    """Copy already-validated values into the global rcParams.
+
+    dict.update skips RcParams.__setitem__, so nothing is re-validated.
+    """
+    import matplotlib
+    dict.update(matplotlib.rcParams, params)
+
+def set_sbnd_style(raster_threshold=None):
+    """
+    Enable the SBND style for Matplotlib.
+
+    Args:
+        raster_threshold (int): If given, lines, collections and patches with
+            more than this many points/vertices are rasterized when saving
+            vector formats (PDF, SVG, PS); text, axes and ticks stay vector.
+            None turns the policy off.
+    """
+    _register_palettes()
+    _apply_rcparams(_sbnd_rcparams())
+    _set_raster_threshold(raster_threshold)
+
+@contextmanager
+def style(raster_threshold=None):
+    """
+    Temporarily enable the SBND style.
+
+    Only the rcParams touched by the style are saved and restored, so switching
+    is cheap enough to do per figure. Works as a context manager or decorator:
+
+        with sbnd_style.style():
+            fig, ax = plt.subplots()
+
+        @sbnd_style.style()
+        def make_plot(): ...
+
+    raster_threshold is as for set_sbnd_style.
+    """
+    import matplotlib
+
+    _register_palettes()
+    params = _sbnd_rcparams()
+    saved = {key: dict.__getitem__(matplotlib.rcParams, key) for key in params}
+    saved_threshold = _raster_threshold
+    _apply_rcparams(params)
+    _set_raster_threshold(raster_threshold)
+    try:
+        yield
+    finally:
+        _apply_rcparams(saved)
+        _set_raster_threshold(saved_threshold)
@@ -0,0 +1,95 @@
+# sbnd_toys.py
+#
+# Fast generation of many Gaussian toy datasets (pseudo-experiments).
+# All datasets are drawn into one contiguous array; dataset i is
+# values[offsets[i]:offsets[i + 1]].
+#
+# Random numbers come from np.random.Generator. The output is cut into fixed
+# blocks and every block gets its own child of one SeedSequence, so blocks can
+# be filled by parallel workers and the result for a given seed is the same
+# whatever the number of workers, and in streaming mode.
+#
+#     values, offsets = gauss_toys(means=[0, 1, 2], sizes=[1000, 2000, 3000], seed=42)
+#     for start, chunk in iter_gauss_toys(means, sizes, seed=42):
+#         ...
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Number of values drawn from each child seed.
+BLOCK_SIZE = 1 << 20
+
+def toy_offsets(sizes):
+    """Start of every dataset in the flat array, plus the total at the end."""
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return offsets
+
+def split_toys(values, offsets):
+    """Split the flat array into a list of per-dataset views (no copies)."""
+    return np.split(values, offsets[1:-1])
+
+def _fill_block(seed, out, start, offsets, means, sigmas):
+    """Draw one block of values starting at flat position `start`."""
+    np.random.Generator(np.random.PCG64(seed)).standard_normal(out=out)
+
+    # Scale and shift by the parameters of the datasets the block overlaps.
+    first = np.searchsorted(offsets, start, side='right') - 1
+    last = np.searchsorted(offsets, start + len(out), side='left')
+    bounds = np.clip(offsets[first:last + 1], start, start + len(out)) - start
+    counts = np.diff(bounds)
+    out *= np.repeat(sigmas[first:last], counts)
+    out += np.repeat(means[first:last], counts)
+
+def _prepare(means, sizes, sigmas, seed):
+    sizes = np.asarray(sizes, dtype=np.int64)
+    means = np.broadcast_to(np.asarray(means, dtype=float), sizes.shape)
+    sigmas = np.broadcast_to(np.asarray(sigmas, dtype=float), sizes.shape)
+    offsets = toy_offsets(sizes)
+    n_blocks = -(-int(offsets[-1]) // BLOCK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(n_blocks)
+    return means, sigmas, offsets, seeds
+
+def gauss_toys(means, sizes, sigmas=1.0, seed=None, n_workers=1):
+    """
+    Draw Gaussian datasets into one contiguous array.
+
+    Args:
+        means (array): Mean of each dataset.
+        sizes (array): Number of values in each dataset.
+        sigmas (float or array): Width of each dataset.
+        seed: Anything accepted by np.random.SeedSequence (None: fresh entropy).
+        n_workers (int): Threads filling blocks concurrently.
+
+    Returns:
+        (values, offsets): float64 array of all values and the int64 offsets,
+        with dataset i at values[offsets[i]:offsets[i + 1]].
+    """
+    means, sigmas, offsets, seeds = _prepare(means, sizes, sigmas, seed)
+    values = np.empty(int(offsets[-1]))
+    jobs = [(s, values[i * BLOCK_SIZE:(i + 1) * BLOCK_SIZE], i * BLOCK_SIZE, offsets, means, sigmas)
+            for i, s in enumerate(seeds)]
+    if n_workers > 1 and len(jobs) > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            list(pool.map(lambda job: _fill_block(*job), jobs))
+    else:
+        for job in jobs:
+            _fill_block(*job)
+    return values, offsets
+
+def iter_gauss_toys(means, sizes, sigmas=1.0, seed=None):
+    """
+    Streaming version of gauss_toys: yield the flat array block by block.
+
+    Yields (start, chunk) with chunk = values[start:start + len(chunk)] of the
+    gauss_toys result for the same arguments; only one block is in memory.
+    Use toy_offsets(sizes) to map positions to datasets.
+    """
+    means, sigmas, offsets, seeds = _prepare(means, sizes, sigmas, seed)
+    total = int(offsets[-1])
+    for i, s in enumerate(seeds):
+        start = i * BLOCK_SIZE
+        chunk = np.empty(min(BLOCK_SIZE, total - start))
+        _fill_block(s, chunk, start, offsets, means, sigmas)
+        yield start, chunk